@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class DiskCache:
+    """
+    Small persistent key -> JSON cache.
+
+    Each entry is one file in `directory`. Entries are evicted least-recently
+    used first once the directory grows past `max_bytes`, and expire after
+    `ttl` seconds when a TTL is given. Safe to share between threads.
+
+    Several processes (uvicorn workers) may share one directory: entries
+    another process wrote are picked up on a miss. Each process enforces
+    `max_bytes` over the entries it knows about.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 50 * 1024 * 1024, ttl: float = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> size in bytes, oldest access first
+        self._total_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-5], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+    def _remove(self, key: str):
+        size = self._index.pop(key, 0)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _adopt(self, key: str, path: str) -> bool:
+        """
+        Indexes an entry written by another process, if there is one.
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        self._index[key] = size
+        self._total_bytes += size
+        return True
+
+    def get(self, key: str):
+        """
+        Returns the cached value or None on a miss.
+        """
+        with self._lock:
+            path = self._path(key)
+            if key not in self._index and not self._adopt(key, path):
+                self.misses += 1
+                return None
+
+            try:
+                if self.ttl and time.time() - os.path.getmtime(path) > self.ttl:
+                    self._remove(key)
+                    self.misses += 1
+                    return None
+
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            if not self.ttl:
+                # Persist recency so LRU order survives restarts
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+
+            self._index.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, value):
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+        with self._lock:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            self._total_bytes -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                oldest = next(iter(self._index))
+                self._remove(oldest)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,91 @@
+import base64
+import hashlib
+import json
+
+from fastapi import HTTPException
+
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(version: int, position) -> str:
+    """
+    Opaque cursor: the data version it was issued for plus a position.
+    """
+    raw = json.dumps([version, position], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """
+    Returns (version, position); raises 400 for a cursor we did not issue.
+    Both are non-negative integers in every cursor we issue.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    for value in (version, position):
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return version, position
+
+
+def check_page_size(limit):
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+
+def parse_fields(fields: str, allowed):
+    """
+    Splits a `fields=` parameter into top-level fields and per-item
+    subfields, e.g. "status,results.author,results.post_url" ->
+    ({"status", "results"}, {"results": {"author", "post_url"}}).
+    Returns (None, {}) when no projection was asked for.
+    """
+    if not fields:
+        return None, {}
+
+    top = set()
+    nested = {}
+    for name in (f.strip() for f in fields.split(",")):
+        if not name:
+            continue
+        head, _, sub = name.partition(".")
+        if head not in allowed:
+            raise HTTPException(status_code=400, detail=f"Unknown field '{head}'")
+        top.add(head)
+        if sub:
+            nested.setdefault(head, set()).add(sub)
+    return top, nested
+
+
+def project(record: dict, fields) -> dict:
+    if fields is None:
+        return record
+    return {k: v for k, v in record.items() if k in fields}
+
+
+def make_etag(*parts) -> str:
+    """
+    Weak ETag over the data version and the request's view parameters,
+    so a 304 can be answered without building the response.
+    """
+    digest = hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored
+    candidates = {_opaque_tag(tag) for tag in if_none_match.split(",")}
+    return _opaque_tag(etag) in candidates
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
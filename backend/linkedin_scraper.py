@@ -1,14 +1,29 @@
 from playwright.sync_api import sync_playwright
+import hashlib
+import json
+import os
 import re
 import time
 from urllib.parse import quote_plus
 
+from text_normalizer import clean_post_text as clean_text
+from scrape_trace import QueryTrace, write_traces, KEPT, FILTERED, NO_CONTENT, ERROR
 
-def clean_text(text: str) -> str:
-    text = text.replace("See more", "")
-    text = text.replace("\n", " ")
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+# Fixed waits (seconds); module-level so replay benchmarks can tune them
+LOAD_WAIT = 4
+SCROLL_STEPS = 3
+SCROLL_WAIT = 1
+POST_SCROLL_WAIT = 0.5
+QUERY_WAIT = 4
+
+# LinkedIn shows post age as a relative label ("3d •", "2h", "1w", "5mo")
+AGE_PATTERN = re.compile(r"\b(\d+)\s*(mo|yr|min|s|m|h|d|w|y)\b")
+AGE_UNIT_HOURS = {
+    "s": 1 / 3600, "m": 1 / 60, "min": 1 / 60, "h": 1, "d": 24,
+    "w": 24 * 7, "mo": 24 * 30, "y": 24 * 365, "yr": 24 * 365,
+}
+
+RECORDING_MANIFEST = "manifest.json"
 
 
 def is_job_related_post(content: str, author: str) -> bool:
@@ -131,7 +146,109 @@ def extract_post_url(post):
     return post_url
 
 
-def _scrape_query(page, query: str, limit: int = 5, time_filter: str = "past-week"):
+def parse_post_age(label: str):
+    """
+    Hours since posting from LinkedIn's relative age label, or None if
+    the label has no recognisable age.
+    """
+    match = AGE_PATTERN.search(label or "")
+    if not match:
+        return None
+    return int(match.group(1)) * AGE_UNIT_HOURS[match.group(2)]
+
+
+def extract_post_age(post):
+    """
+    Extract the post's age in hours from the actor sub-description.
+    """
+    age_selectors = [
+        "span.update-components-actor__sub-description span[aria-hidden='true']",
+        "span.update-components-actor__sub-description",
+        "a.app-aware-link[href*='/feed/update/']",
+    ]
+    for selector in age_selectors:
+        try:
+            age_locator = post.locator(selector).first
+            if age_locator.count() > 0:
+                age_hours = parse_post_age(age_locator.inner_text())
+                if age_hours is not None:
+                    return age_hours
+        except:
+            continue
+    return None
+
+
+def build_search_url(query: str, time_filter: str = "past-week") -> str:
+    # Build search URL with time filter - EXACT format from LinkedIn
+    base_url = f"https://www.linkedin.com/search/results/content/?keywords={quote_plus(query)}"
+    
+    # Add datePosted parameter with EXACT format: datePosted="past-week"
+    if time_filter == "past-24h":
+        base_url += '&datePosted=%22past-24h%22'
+    elif time_filter == "past-week":
+        base_url += '&datePosted=%22past-week%22'
+    elif time_filter == "past-month":
+        base_url += '&datePosted=%22past-month%22'
+    
+    return base_url
+
+
+def _load_manifest(directory: str) -> dict:
+    path = os.path.join(directory, RECORDING_MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_recording(directory: str, url: str, html: str, query: str = None) -> str:
+    """
+    Saves a search-result page's HTML for later replay, keyed by the
+    URL it was loaded from. Returns the HTML file path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    filename = f"search_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.html"
+    with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+        f.write(html)
+
+    manifest = _load_manifest(directory)
+    manifest[url] = {"file": filename, "query": query, "recorded_at": round(time.time())}
+    tmp_path = os.path.join(directory, f"{RECORDING_MANIFEST}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, RECORDING_MANIFEST))
+
+    return os.path.join(directory, filename)
+
+
+def enable_replay(page, directory: str):
+    """
+    Serves recorded search pages through Playwright route interception.
+    Recorded URLs get their saved HTML, other documents a 404 page, and
+    every other request (scripts, images, XHR) is aborted, so nothing
+    leaves the machine.
+    """
+    manifest = _load_manifest(directory)
+    pages = {}
+    for url, entry in manifest.items():
+        with open(os.path.join(directory, entry["file"]), "r", encoding="utf-8") as f:
+            pages[url] = f.read()
+
+    def handle(route):
+        request = route.request
+        if request.resource_type != "document":
+            route.abort()
+        elif request.url in pages:
+            route.fulfill(status=200, content_type="text/html", body=pages[request.url])
+        else:
+            route.fulfill(status=404, content_type="text/html", body="<html><body>Not recorded</body></html>")
+
+    page.route("**/*", handle)
+    return manifest
+
+
+def _scrape_query(page, query: str, limit: int = 5, time_filter: str = "past-week",
+                  max_checks: int = None, stats: dict = None, record_dir: str = None):
     """
     Scrapes LinkedIn posts for a single search query.
     Now with time filter and job keyword filtering!
@@ -140,38 +257,53 @@ def _scrape_query(page, query: str, limit: int = 5, time_filter: str = "past-wee
     - "past-24h" (Past 24 hours)
     - "past-week" (Past week) - DEFAULT
     - "past-month" (Past month)
+
+    max_checks caps how many posts are examined (default limit * 3).
+    If `stats` is given it is filled with the query's trace record
+    (see scrape_trace.QueryTrace): yield counters, phase timings,
+    selector fallbacks and per-post outcomes.
+    If `record_dir` is given the loaded search page is saved there for
+    replay (see save_recording / enable_replay).
     """
+    trace = QueryTrace(query, time_filter)
+
+    try:
+        return _scrape_query_posts(page, query, limit, time_filter, max_checks, trace, record_dir)
+    finally:
+        if stats is not None:
+            stats.update(trace.finish())
+
+
+def _scrape_query_posts(page, query, limit, time_filter, max_checks, trace, record_dir=None):
+    counters = trace.record
+
     try:
         print(f"  🔗 Navigating to search results...")
         
-        # Build search URL with time filter - EXACT format from LinkedIn
-        base_url = f"https://www.linkedin.com/search/results/content/?keywords={quote_plus(query)}"
-        
-        # Add datePosted parameter with EXACT format: datePosted="past-week"
-        if time_filter == "past-24h":
-            base_url += '&datePosted=%22past-24h%22'
-        elif time_filter == "past-week":
-            base_url += '&datePosted=%22past-week%22'
-        elif time_filter == "past-month":
-            base_url += '&datePosted=%22past-month%22'
-        
-        search_url = base_url
+        search_url = build_search_url(query, time_filter)
         print(f"  ⏰ Time filter: {time_filter}")
         print(f"  🔗 URL: {search_url[:100]}...")
         
-        try:
-            page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
-        except Exception as e:
-            print(f"  ⚠️ Navigation issue: {e}")
-            time.sleep(2)
-            page.goto(search_url, wait_until="networkidle", timeout=40000)
+        with trace.span("navigate"):
+            try:
+                page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
+            except Exception as e:
+                print(f"  ⚠️ Navigation issue: {e}")
+                counters["navigation_retried"] = True
+                trace.sleep("navigate_retry_wait", 2)
+                page.goto(search_url, wait_until="networkidle", timeout=40000)
         
         print(f"  ⏳ Waiting for content to load...")
-        time.sleep(4)
+        trace.sleep("load_wait", LOAD_WAIT)
         
-        for i in range(3):
-            page.evaluate("window.scrollBy(0, window.innerHeight)")
-            time.sleep(1)
+        for i in range(SCROLL_STEPS):
+            with trace.span("scroll"):
+                page.evaluate("window.scrollBy(0, window.innerHeight)")
+            trace.sleep("scroll_wait", SCROLL_WAIT)
+
+        if record_dir:
+            path = save_recording(record_dir, search_url, page.content(), query)
+            print(f"  📼 Recorded search page to {path}")
         
         post_selectors = [
             "div.feed-shared-update-v2",
@@ -181,14 +313,16 @@ def _scrape_query(page, query: str, limit: int = 5, time_filter: str = "past-wee
         ]
         
         posts = None
-        for selector in post_selectors:
-            try:
-                posts = page.locator(selector)
-                if posts.count() > 0:
-                    print(f"  ✓ Found {posts.count()} posts using selector: {selector}")
-                    break
-            except:
-                continue
+        with trace.span("find_posts"):
+            for selector in post_selectors:
+                try:
+                    posts = page.locator(selector)
+                    if posts.count() > 0:
+                        print(f"  ✓ Found {posts.count()} posts using selector: {selector}")
+                        counters["post_selector"] = selector
+                        break
+                except:
+                    continue
         
         if not posts or posts.count() == 0:
             print(f"  ⚠️ No posts found for query: {query}")
@@ -198,16 +332,26 @@ def _scrape_query(page, query: str, limit: int = 5, time_filter: str = "past-wee
         results = []
         post_count = posts.count()
         filtered_count = 0
+        counters["available"] = post_count
+
+        if max_checks is None:
+            max_checks = limit * 3  # Check more posts to account for filtering
 
-        for i in range(min(limit * 3, post_count)):  # Check more posts to account for filtering
+        for i in range(min(max_checks, post_count)):
             if len(results) >= limit:  # Stop when we have enough valid posts
                 break
                 
+            counters["checked"] += 1
+            post_started = time.perf_counter()
+            content_used = None
+            author_used = None
+
             try:
                 post = posts.nth(i)
                 
-                post.scroll_into_view_if_needed()
-                time.sleep(0.5)
+                with trace.span("post_scroll"):
+                    post.scroll_into_view_if_needed()
+                trace.sleep("post_scroll_wait", POST_SCROLL_WAIT)
 
                 content = ""
                 content_selectors = [
@@ -219,17 +363,20 @@ def _scrape_query(page, query: str, limit: int = 5, time_filter: str = "past-wee
                     "div.feed-shared-inline-show-more-text"
                 ]
                 
-                for selector in content_selectors:
-                    try:
-                        content_locator = post.locator(selector).first
-                        if content_locator.count() > 0:
-                            content = clean_text(content_locator.inner_text())
-                            if len(content) > 20:
-                                break
-                    except:
-                        continue
+                with trace.span("extract_content"):
+                    for selector in content_selectors:
+                        try:
+                            content_locator = post.locator(selector).first
+                            if content_locator.count() > 0:
+                                content = clean_text(content_locator.inner_text())
+                                if len(content) > 20:
+                                    content_used = selector
+                                    break
+                        except:
+                            continue
 
                 if not content or len(content) < 20:
+                    trace.add_post(i, NO_CONTENT, time.perf_counter() - post_started)
                     continue
 
                 # Extract author
@@ -242,69 +389,86 @@ def _scrape_query(page, query: str, limit: int = 5, time_filter: str = "past-wee
                     "a.app-aware-link span[aria-hidden='true']"
                 ]
                 
-                for selector in author_selectors:
-                    try:
-                        author_locator = post.locator(selector).first
-                        if author_locator.count() > 0:
-                            author_text = author_locator.inner_text().strip()
-                            if author_text and len(author_text) > 1:
-                                author = author_text
-                                break
-                    except:
-                        continue
+                with trace.span("extract_author"):
+                    for selector in author_selectors:
+                        try:
+                            author_locator = post.locator(selector).first
+                            if author_locator.count() > 0:
+                                author_text = author_locator.inner_text().strip()
+                                if author_text and len(author_text) > 1:
+                                    author = author_text
+                                    author_used = selector
+                                    break
+                        except:
+                            continue
 
                 # 🔥 KEYWORD FILTERING - Check if post is job-related
                 if not is_job_related_post(content, author):
                     filtered_count += 1
+                    counters["filtered"] += 1
+                    trace.add_post(i, FILTERED, time.perf_counter() - post_started, content_used, author_used)
                     print(f"  ⚠️ Post {i+1}: Filtered out (not job-related)")
                     continue
 
                 # Extract POST URL
-                post_url = extract_post_url(post)
+                with trace.span("extract_url"):
+                    post_url = extract_post_url(post)
                 
                 if not post_url:
                     print(f"  ⚠️ Post {i+1}: Could not extract post URL")
                 
+                with trace.span("extract_age"):
+                    age_hours = extract_post_age(post)
+                # Stored as a time, not an age, so the post keeps ageing after the scrape
+                posted_at = time.time() - age_hours * 3600 if age_hours is not None else None
+
                 # Collect links
                 links = []
                 
                 if post_url:
                     links.append(post_url)
                 
-                try:
-                    anchor_selectors = [
-                        "a[href*='http']:not([href*='linkedin.com'])",
-                        "a.app-aware-link[href*='company']",
-                    ]
-                    
-                    for anchor_selector in anchor_selectors:
-                        anchors = post.locator(anchor_selector)
-                        for j in range(min(2, anchors.count())):
-                            try:
-                                href = anchors.nth(j).get_attribute("href")
-                                if href and href not in links:
-                                    if not href.startswith("http"):
-                                        href = f"https://www.linkedin.com{href}"
-                                    if "/in/" not in href or len(links) == 0:
-                                        links.append(href)
-                            except:
-                                continue
-                except:
-                    pass
+                with trace.span("extract_links"):
+                    try:
+                        anchor_selectors = [
+                            "a[href*='http']:not([href*='linkedin.com'])",
+                            "a.app-aware-link[href*='company']",
+                        ]
+                        
+                        for anchor_selector in anchor_selectors:
+                            anchors = post.locator(anchor_selector)
+                            for j in range(min(2, anchors.count())):
+                                try:
+                                    href = anchors.nth(j).get_attribute("href")
+                                    if href and href not in links:
+                                        if not href.startswith("http"):
+                                            href = f"https://www.linkedin.com{href}"
+                                        if "/in/" not in href or len(links) == 0:
+                                            links.append(href)
+                                except:
+                                    continue
+                    except:
+                        pass
 
                 result = {
                     "query": query,
                     "author": author,
                     "content": content[:500],
                     "post_url": post_url,
-                    "links": links[:4]
+                    "links": links[:4],
+                    "posted_at": posted_at
                 }
                 
                 results.append(result)
+                counters["kept"] += 1
+                trace.add_post(i, KEPT, time.perf_counter() - post_started, content_used, author_used,
+                               has_url=bool(post_url))
                 post_link_status = "✓" if post_url else "✗"
                 print(f"  ✅ Post {len(results)}/{limit}: {author[:40]}... ({len(content)} chars) - {post_link_status}")
 
             except Exception as e:
+                trace.add_post(i, ERROR, time.perf_counter() - post_started, content_used, author_used,
+                               error=str(e))
                 print(f"  ⚠️ Error extracting post {i+1}: {str(e)[:100]}")
                 continue
 
@@ -312,11 +476,58 @@ def _scrape_query(page, query: str, limit: int = 5, time_filter: str = "past-wee
         return results
         
     except Exception as e:
+        counters["error"] = str(e)[:200]
         print(f"  ❌ Error scraping query '{query}': {str(e)[:200]}")
         return []
 
 
-def scrape_posts(queries, limit_per_query: int = 5, time_filter: str = "past-week"):
+def _login(page) -> bool:
+    """
+    Interactive LinkedIn login in the visible browser window.
+    Returns False if the session still lands on a login/checkpoint page.
+    """
+    print("\n" + "="*60)
+    print("🔐 STEP 1: LOGIN TO LINKEDIN")
+    print("="*60)
+    
+    try:
+        page.goto("https://www.linkedin.com/login", wait_until="domcontentloaded", timeout=30000)
+    except:
+        print("⚠️ Slow connection, trying again...")
+        page.goto("https://www.linkedin.com/login", timeout=40000)
+    
+    print("\n👉 Please log in to LinkedIn in the browser window")
+    print("👉 Complete any security checks if prompted")
+    print("👉 Once logged in, you'll see the LinkedIn interface")
+    
+    input("\n✋ Press ENTER after you've successfully logged in...")
+
+    print("\n🔍 Verifying login by testing search...")
+    
+    try:
+        test_url = "https://www.linkedin.com/search/results/content/?keywords=test"
+        page.goto(test_url, wait_until="domcontentloaded", timeout=15000)
+        time.sleep(3)
+        
+        current_url = page.url
+        if "login" in current_url or "checkpoint" in current_url:
+            print("❌ Login verification failed - still on login/checkpoint page")
+            print(f"Current URL: {current_url}")
+            print("⚠️ Please complete the login process and try again")
+            return False
+        
+        print("✅ Login verified successfully!\n")
+        
+    except Exception as e:
+        print(f"⚠️ Verification issue (but proceeding anyway): {str(e)[:100]}")
+        print("   If scraping fails, please try running the script again\n")
+
+    return True
+
+
+def scrape_posts(queries, limit_per_query: int = 5, time_filter: str = "past-week",
+                 plan=None, query_stats=None, trace_path: str = None,
+                 record_dir: str = None, replay_dir: str = None):
     """
     Scrapes LinkedIn posts for multiple queries.
     Now with time filtering and job keyword filtering!
@@ -326,15 +537,31 @@ def scrape_posts(queries, limit_per_query: int = 5, time_filter: str = "past-wee
     - "past-week" - Last week (DEFAULT)
     - "past-month" - Last month
     - None - All time
+
+    plan: optional scrape plan from the backend, a list of
+    {"query", "limit", "max_checks", ...} in the order to run them.
+    It overrides `queries` and `limit_per_query`.
+    query_stats: optional list that receives one trace record per query
+    (yield counters, timings, selector fallbacks, post outcomes).
+    trace_path: optional JSON lines file the trace records are appended
+    to as each query finishes, for `trace_report.py`.
+    record_dir: save every loaded search page there for offline replay.
+    replay_dir: skip login and serve search pages recorded earlier
+    instead of hitting LinkedIn (headless, no network).
     """
 
     all_results = []
 
+    if plan:
+        steps = [(p["query"], p.get("limit", limit_per_query), p.get("max_checks"), p) for p in plan]
+    else:
+        steps = [(q, limit_per_query, None, None) for q in queries]
+
     with sync_playwright() as p:
         print("\n🌐 Launching browser...")
         
         browser = p.chromium.launch(
-            headless=False,
+            headless=bool(replay_dir),
             args=[
                 '--disable-blink-features=AutomationControlled',
                 '--disable-dev-shm-usage',
@@ -350,42 +577,12 @@ def scrape_posts(queries, limit_per_query: int = 5, time_filter: str = "past-wee
         
         page = context.new_page()
 
-        print("\n" + "="*60)
-        print("🔐 STEP 1: LOGIN TO LINKEDIN")
-        print("="*60)
-        
-        try:
-            page.goto("https://www.linkedin.com/login", wait_until="domcontentloaded", timeout=30000)
-        except:
-            print("⚠️ Slow connection, trying again...")
-            page.goto("https://www.linkedin.com/login", timeout=40000)
-        
-        print("\n👉 Please log in to LinkedIn in the browser window")
-        print("👉 Complete any security checks if prompted")
-        print("👉 Once logged in, you'll see the LinkedIn interface")
-        
-        input("\n✋ Press ENTER after you've successfully logged in...")
-
-        print("\n🔍 Verifying login by testing search...")
-        
-        try:
-            test_url = "https://www.linkedin.com/search/results/content/?keywords=test"
-            page.goto(test_url, wait_until="domcontentloaded", timeout=15000)
-            time.sleep(3)
-            
-            current_url = page.url
-            if "login" in current_url or "checkpoint" in current_url:
-                print("❌ Login verification failed - still on login/checkpoint page")
-                print(f"Current URL: {current_url}")
-                print("⚠️ Please complete the login process and try again")
-                browser.close()
-                return []
-            
-            print("✅ Login verified successfully!\n")
-            
-        except Exception as e:
-            print(f"⚠️ Verification issue (but proceeding anyway): {str(e)[:100]}")
-            print("   If scraping fails, please try running the script again\n")
+        if replay_dir:
+            enable_replay(page, replay_dir)
+            print(f"\n📼 Replay mode: serving recorded search pages from {replay_dir}")
+        elif not _login(page):
+            browser.close()
+            return []
 
         print("\n" + "="*60)
         print("🔍 STEP 2: SCRAPING LINKEDIN POSTS")
@@ -393,25 +590,39 @@ def scrape_posts(queries, limit_per_query: int = 5, time_filter: str = "past-wee
         print(f"🎯 Keyword Filtering: ENABLED (job posts only)")
         print("="*60 + "\n")
         
-        for idx, query in enumerate(queries, 1):
+        for idx, (query, limit, max_checks, step) in enumerate(steps, 1):
             print(f"\n{'─'*60}")
-            print(f"📋 Query {idx}/{len(queries)}: '{query}'")
+            print(f"📋 Query {idx}/{len(steps)}: '{query}' (limit {limit})")
             print(f"{'─'*60}")
             
+            stats = {}
             posts = _scrape_query(
                 page=page,
                 query=query,
-                limit=limit_per_query,
-                time_filter=time_filter
+                limit=limit,
+                time_filter=time_filter,
+                max_checks=max_checks,
+                stats=stats,
+                record_dir=record_dir
             )
+
+            if step and step.get("template"):
+                stats["template"] = step["template"]
             
             all_results.extend(posts)
             print(f"✅ Collected {len(posts)} job posts for this query\n")
             
-            if idx < len(queries):
-                wait_time = 4
+            if idx < len(steps):
+                wait_time = QUERY_WAIT
                 print(f"⏳ Waiting {wait_time}s before next query...")
+                wait_started = time.perf_counter()
                 time.sleep(wait_time)
+                stats["timings"]["query_wait"] = round(time.perf_counter() - wait_started, 4)
+
+            if query_stats is not None:
+                query_stats.append(stats)
+            if trace_path:
+                write_traces([stats], trace_path)
 
         print("\n" + "="*60)
         print(f"✅ SCRAPING COMPLETE!")
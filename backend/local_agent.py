@@ -1,5 +1,6 @@
 import requests
 from linkedin_scraper import scrape_posts
+from scrape_trace import TRACE_FILE
 import json
 
 BACKEND_URL = "http://127.0.0.1:8000"
@@ -35,10 +36,21 @@ def run_agent(job_id: str):
         print("🚀 Starting LinkedIn scraper...")
         print("="*60)
         
+        # The backend plans per-query limits from historical yield
+        plan = job_data.get("scrape_plan")
+        if plan:
+            print(f"🧮 Using yield-based scrape plan ({sum(p['limit'] for p in plan)} posts budgeted)")
+
+        # Per-query trace records, also appended locally to TRACE_FILE
+        traces = []
         results = scrape_posts(
             queries=queries,
-            limit_per_query=LIMIT_PER_QUERY
+            limit_per_query=LIMIT_PER_QUERY,
+            plan=plan,
+            query_stats=traces,
+            trace_path=TRACE_FILE
         )
+        print(f"🧾 Scrape traces written to {TRACE_FILE} (python trace_report.py {TRACE_FILE})")
 
         if not results:
             print("❌ No results scraped")
@@ -47,7 +59,7 @@ def run_agent(job_id: str):
         print(f"\n📤 Sending {len(results)} posts to backend")
 
         # Submit results
-        payload = {"results": results}
+        payload = {"results": results, "traces": traces}
         
         submit = requests.post(
             f"{BACKEND_URL}{SUBMIT_ENDPOINT}/{job_id}",
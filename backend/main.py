@@ -1,20 +1,61 @@
-from fastapi import FastAPI, UploadFile, File, Body, HTTPException
+from fastapi import FastAPI, UploadFile, File, Body, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-import shutil
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import os
 import uuid
+import hashlib
+import math
+import time
 import traceback
 
-from resume_parser import extract_text_from_pdf
-from skill_extractor import extract_skills_and_topics
-from query_builder_local_llm import build_search_queries  # This will use Ollama now!
+from disk_cache import DiskCache
+from resume_parser import extract_text_and_metadata
+from skill_extractor import extract_skills_topics_and_locations
+from query_builder_local_llm import abuild_search_queries_hedged, llm_cache, LLM_LATENCY_BUDGET  # This will use Ollama now!
+from ollama_client import get_client
+from query_yield import QueryYieldStore, query_template, DEFAULT_LIMIT_PER_QUERY
+from scrape_trace import write_traces
+from job_views import (
+    encode_cursor, decode_cursor, check_page_size, parse_fields,
+    project, make_etag, etag_matches,
+)
+from responses import APIResponse, CompressionMiddleware, PayloadCache
+from upload_limit import UploadLimitMiddleware
+from post_store import PostColumns
+from shared_state import SharedJobStore, JOBS_CHANNEL
+import results_archive
+import metrics
+
+
+UPLOAD_DIR = "uploads"
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Uploads above MAX_UPLOAD_BYTES are refused by UploadLimitMiddleware before
+# (or while) the body is received; anything up to IN_MEMORY_MAX_BYTES never
+# touches UPLOAD_DIR
+UPLOAD_CHUNK_BYTES = 64 * 1024
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+# The limit counts the whole multipart body; this much on top of
+# MAX_UPLOAD_BYTES is allowed for boundaries, part headers and form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+IN_MEMORY_MAX_BYTES = 2 * 1024 * 1024
+KEEP_UPLOADS = False
+# Files left in UPLOAD_DIR (e.g. by a crash mid-parse) are deleted after this
+UPLOAD_MAX_AGE_SECONDS = 3600
 
 
-app = FastAPI(title="Resume → LinkedIn Pipeline API")
+app = FastAPI(title="Resume → LinkedIn Pipeline API", default_response_class=APIResponse)
 
 
+# Innermost first: compression time is included in the recorded latency
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES, paths=("/process-resume",),
+                   overhead_bytes=MULTIPART_OVERHEAD_BYTES)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -23,8 +64,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+CACHE_DIR = "cache"
+
+# Scraper trace records uploaded by agents, one JSON line per query
+TRACE_LOG = os.path.join(CACHE_DIR, "scrape_traces.jsonl")
+RESUME_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Parsed resumes keyed by SHA-256 of the uploaded bytes
+resume_cache = DiskCache(os.path.join(CACHE_DIR, "resumes"), max_bytes=RESUME_CACHE_MAX_BYTES)
+
+# Serialized /results and /rank bodies of completed jobs, keyed by version
+payload_cache = PayloadCache()
+
+# Historical posts found/kept per query template, used to plan scrape budgets
+query_yield = QueryYieldStore(os.path.join(CACHE_DIR, "query_yield.json"))
 
 
 if os.path.basename(os.getcwd()) == 'backend':
@@ -36,7 +89,83 @@ if not os.path.exists(FRONTEND_DIR):
     os.makedirs(FRONTEND_DIR)
     print(f"⚠️ Created {FRONTEND_DIR} directory. Please place your HTML, CSS, and JS files there.")
 
-job_store = {}
+# Seconds a job is kept after its last update, per status (None: forever)
+JOB_TTL_SECONDS = {
+    "waiting_for_linkedin": 6 * 60 * 60,
+    "scraping": 6 * 60 * 60,
+    "completed": 24 * 60 * 60,
+}
+# Estimated memory of the results, resume text and traces each worker
+# keeps decoded; beyond this the least recently read jobs' payloads stay
+# on disk until needed
+JOB_MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+SWEEP_INTERVAL_SECONDS = 5 * 60
+
+# Jobs ranked together by one /rank/batch model fit
+MAX_BATCH_RANK_JOBS = 1000
+
+# Shared by all uvicorn workers (SQLite under cache/). Every job mutation
+# takes the next global data version, which drives ETags,
+# `since_version` deltas and cursor validity
+job_store = SharedJobStore(payload_budget=JOB_MEMORY_BUDGET_BYTES)
+
+# How often each worker reads job events published by the others
+EVENT_POLL_SECONDS = 1.0
+
+# Fields of /results/{job_id} whose changes are versioned
+RESULT_FIELDS = ("status", "skills", "queries", "queries_source", "results", "result_count")
+# Per-job summary fields available in /jobs
+JOB_FIELDS = ("status", "skills", "result_count", "queries_source", "locations", "country", "version")
+DEFAULT_JOB_FIELDS = ("status", "skills", "result_count")
+
+
+STAGE_SECONDS = metrics.Histogram(
+    "pipeline_stage_seconds", "Time spent per pipeline stage", ["stage"]
+)
+JOB_TRANSITIONS = metrics.Counter(
+    "job_transitions_total", "Jobs entering each status", ["status"]
+)
+QUERIES_GENERATED = metrics.Counter(
+    "queries_generated_total", "Query sets generated, by source", ["source"]
+)
+RESULTS_RECEIVED = metrics.Counter(
+    "results_received_total", "Scraped posts submitted by agents"
+)
+JOB_RESULT_COUNT = metrics.Histogram(
+    "job_result_count", "Posts submitted per job", buckets=(0, 5, 10, 25, 50, 100, 250, 500)
+)
+JOBS_EXPIRED = metrics.Counter(
+    "jobs_expired_total", "Jobs deleted by the sweeper after their TTL"
+)
+UPLOADS_SWEPT = metrics.Counter(
+    "uploads_swept_total", "Stale files deleted from the upload directory"
+)
+
+
+def _job_status_counts():
+    return {(status,): count for status, count in job_store.status_counts().items()}
+
+
+def _cache_stat(field):
+    def collect():
+        return {
+            ("resume",): resume_cache.stats()[field],
+            ("llm",): llm_cache.stats()[field],
+            ("payload",): payload_cache.stats()[field],
+        }
+    return collect
+
+
+def _job_memory():
+    memory = job_store.memory()
+    return {("metadata",): memory["job_bytes"], ("payload",): memory["payload_bytes"]}
+
+
+metrics.CallbackMetric("jobs", "Jobs currently in job_store, by status", ["status"], _job_status_counts)
+metrics.CallbackMetric("cache_hits_total", "Cache hits", ["cache"], _cache_stat("hits"), kind="counter")
+metrics.CallbackMetric("cache_misses_total", "Cache misses", ["cache"], _cache_stat("misses"), kind="counter")
+metrics.CallbackMetric("cache_bytes", "Bytes stored per cache", ["cache"], _cache_stat("bytes"))
+metrics.CallbackMetric("job_memory_bytes", "Decoded job state held by this worker", ["part"], _job_memory)
 
 
 if os.path.exists(FRONTEND_DIR):
@@ -51,7 +180,7 @@ def serve_frontend():
     if os.path.exists(html_path):
         return FileResponse(html_path)
     else:
-        return JSONResponse(
+        return APIResponse(
             status_code=404,
             content={
                 "error": "Frontend not found", 
@@ -64,14 +193,14 @@ def serve_script():
     js_path = os.path.join(FRONTEND_DIR, "script.js")
     if os.path.exists(js_path):
         return FileResponse(js_path, media_type="application/javascript")
-    return JSONResponse(status_code=404, content={"error": "script.js not found"})
+    return APIResponse(status_code=404, content={"error": "script.js not found"})
 
 @app.get("/style.css", include_in_schema=False)
 def serve_style():
     css_path = os.path.join(FRONTEND_DIR, "style.css")
     if os.path.exists(css_path):
         return FileResponse(css_path, media_type="text/css")
-    return JSONResponse(status_code=404, content={"error": "style.css not found"})
+    return APIResponse(status_code=404, content={"error": "style.css not found"})
 
 
 @app.get("/health")
@@ -80,9 +209,190 @@ def health():
         "status": "ok",
         "message": "LinkedIn Pipeline API is running",
         "jobs_count": len(job_store),
-        "llm_backend": "Ollama (Local)"
+        "llm_backend": "Ollama (Local)",
+        "resume_cache": resume_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "payload_cache": payload_cache.stats(),
+        "shared_state": job_store.stats(),
+        "job_memory": job_store.memory()
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    Prometheus scrape endpoint
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+async def _receive_upload(job_id: str, file: UploadFile):
+    """
+    Reads the (already size-checked) upload in chunks while hashing it.
+
+    Returns (content_hash, content, file_path): small files come back as
+    bytes with file_path None, larger ones are written to UPLOAD_DIR off
+    the event loop and content is None.
+    """
+    hasher = hashlib.sha256()
+    buffer = bytearray()
+    size = 0
+    file_path = None
+    out = None
+
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            hasher.update(chunk)
+
+            if out is None and size > IN_MEMORY_MAX_BYTES:
+                file_path = os.path.join(UPLOAD_DIR, f"{job_id}_{os.path.basename(file.filename)}")
+                out = await run_in_threadpool(open, file_path, "wb")
+                await run_in_threadpool(out.write, buffer)
+                buffer = None
+
+            if out is not None:
+                await run_in_threadpool(out.write, chunk)
+            else:
+                buffer.extend(chunk)
+    except BaseException:
+        if out is not None:
+            out.close()
+            os.remove(file_path)
+        raise
+
+    if out is not None:
+        await run_in_threadpool(out.close)
+        print(f"💾 Streamed {size} bytes to: {file_path}")
+        return hasher.hexdigest(), None, file_path
+
+    print(f"🧠 Keeping {size} byte upload in memory")
+    return hasher.hexdigest(), bytes(buffer), None
+
+
+def _scrape_plan(queries, skills, locations=None, country=None):
+    templates = [query_template(q, skills, locations, country) for q in queries]
+    return query_yield.plan(queries, templates, limit_per_query=DEFAULT_LIMIT_PER_QUERY)
+
+
+def _apply_llm_queries(job_id: str, queries):
+    """
+    Swaps LLM queries into a job the agent has not fetched yet. The
+    agent's fetch moves the job to "scraping" (see _pick_up_job), after
+    which the conditional update below no longer applies, so the stored
+    queries are always the ones that were scraped.
+    Blocking (SQLite write): call it from the threadpool.
+    """
+    job = job_store.get(job_id)
+    if job and job["status"] == "waiting_for_linkedin" and job.get("queries_source") != "llm":
+        changes = {
+            "queries": queries,
+            "queries_source": "llm",
+            "scrape_plan": _scrape_plan(queries, job["skills"], job.get("locations"), job.get("country")),
+        }
+        # The agent may have submitted in another worker meanwhile
+        if job_store.update(job_id, changes, ("queries", "queries_source"), expect_status="waiting_for_linkedin"):
+            QUERIES_GENERATED.inc(source="llm_late")
+            print(f"🔄 Job {job_id} updated with LLM queries")
+
+
+def _store_late_queries(job_id: str, content_hash: str, parsed: dict, queries):
+    resume_cache.set(content_hash, parsed)
+    _apply_llm_queries(job_id, queries)
+
+
+def _merge_late_queries(job_id: str, content_hash: str, parsed: dict, queries):
+    """
+    Called on the event loop when Ollama answers after the latency
+    budget. The parse is final now: it goes into the resume cache
+    (pending parses never do) and its queries into the job, both from the
+    threadpool since the job write may wait on another worker's
+    transaction. If the job does not exist yet, process_resume applies
+    the queries once it has created it.
+    """
+    parsed["queries"] = queries
+    parsed["queries_source"] = "llm"
+    asyncio.ensure_future(run_in_threadpool(_store_late_queries, job_id, content_hash, parsed, queries))
+
+
+async def _parse_resume(job_id: str, source, content_hash: str):
+    """
+    Full pipeline for a resume not seen before: PDF text, NLP extraction and
+    query generation. `source` is the upload's bytes or its path on disk.
+    The result is returned, and stored in resume_cache when the queries
+    came from the LLM.
+    """
+    print("📖 Extracting text from PDF...")
+    with STAGE_SECONDS.time(stage="pdf_parse"):
+        pdf_data = await run_in_threadpool(extract_text_and_metadata, source)
+    resume_text = pdf_data["text"]
+    print(f"⏱️  PDF backend: {pdf_data['backend']} ({pdf_data['elapsed_ms']:.0f} ms, {pdf_data['pages']} pages)")
+
+    if not resume_text or len(resume_text) < 50:
+        print("❌ Could not extract enough text from resume")
+        raise HTTPException(
+            status_code=400,
+            detail="Could not extract text from resume. Please ensure it's a valid PDF with text content."
+        )
+
+    print(f"✅ Extracted {len(resume_text)} characters")
+
+    print("🔍 Extracting skills and locations...")
+    with STAGE_SECONDS.time(stage="nlp"):
+        extracted = await run_in_threadpool(
+            extract_skills_topics_and_locations, resume_text, raw_text=pdf_data["raw_text"]
+        )
+    skills = extracted.get("skills", [])
+    locations = extracted.get("locations", [])
+    country = extracted.get("country")
+
+    if not skills:
+        print("⚠️ No skills found, using resume text for query generation")
+        skills = ["software", "developer"]  # Fallback
+
+    print(f"✅ Found {len(skills)} skills: {skills[:5]}")
+
+    parsed = {
+        "text": resume_text,
+        "skills": skills,
+        "topics": extracted.get("topics", []),
+        "locations": locations,
+        "country": country,
     }
 
+    print("🤖 Generating search queries with local LLM (Ollama)...")
+    print(f"⏳ Waiting up to {LLM_LATENCY_BUDGET}s before falling back to templates...")
+
+    with STAGE_SECONDS.time(stage="llm"):
+        queries, queries_source = await abuild_search_queries_hedged(
+            skills=skills, 
+            locations=locations,
+            country=country,
+            max_queries=12,
+            budget=LLM_LATENCY_BUDGET,
+            on_llm_queries=lambda late_queries: _merge_late_queries(job_id, content_hash, parsed, late_queries)
+        )
+    QUERIES_GENERATED.inc(source=queries_source)
+
+    print(f"✅ Generated {len(queries)} queries ({queries_source})")
+
+    if queries:
+        print(f"📋 Sample queries: {queries[:3]}")
+
+    parsed["queries"] = queries
+    parsed["queries_source"] = queries_source
+    # Template queries stand in for an LLM that was down or slow: caching
+    # them would keep serving them for this resume after Ollama recovers
+    if queries_source == "llm":
+        # File writes and LRU eviction: keep them off the event loop
+        await run_in_threadpool(resume_cache.set, content_hash, parsed)
+
+    return parsed
+
 
 @app.post("/process-resume")
 async def process_resume(file: UploadFile = File(...)):
@@ -103,71 +413,51 @@ async def process_resume(file: UploadFile = File(...)):
         job_id = str(uuid.uuid4())
         print(f"🆔 Generated Job ID: {job_id}")
 
-        
-        file_path = os.path.join(UPLOAD_DIR, f"{job_id}_{file.filename}")
-        
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        print(f"💾 Saved resume to: {file_path}")
-
-        
-        print("📖 Extracting text from PDF...")
-        resume_text = extract_text_from_pdf(file_path)
-
-        if not resume_text or len(resume_text) < 50:
-            print("❌ Could not extract enough text from resume")
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract text from resume. Please ensure it's a valid PDF with text content."
-            )
-
-        print(f"✅ Extracted {len(resume_text)} characters")
-
-        
-        print("🔍 Extracting skills...")
-        extracted = extract_skills_and_topics(resume_text)
-        skills = extracted.get("skills", [])
-
-        if not skills:
-            print("⚠️ No skills found, using resume text for query generation")
-            skills = ["software", "developer"]  # Fallback
-
-        print(f"✅ Found {len(skills)} skills: {skills[:5]}")
-
-        
-        print("🤖 Generating search queries with local LLM (Ollama)...")
-        print("⏳ This may take 10-30 seconds for the first query...")
-        
-        queries = build_search_queries(
-            skills=skills, 
-            resume_text=resume_text, 
-            max_queries=12
-        )
-        
-        print(f"✅ Generated {len(queries)} queries")
+        with STAGE_SECONDS.time(stage="upload"):
+            content_hash, content, file_path = await _receive_upload(job_id, file)
 
-        
-        if queries:
-            print(f"📋 Sample queries: {queries[:3]}")
+        try:
+            parsed = await run_in_threadpool(resume_cache.get, content_hash)
+            if parsed and parsed.get("queries_source", "llm") != "llm":
+                # Written by a version that also cached template queries
+                parsed = None
+            if parsed:
+                print(f"⚡ Cache hit for resume {content_hash[:12]}, skipping parsing and LLM")
+            else:
+                parsed = await _parse_resume(job_id, content if content is not None else file_path, content_hash)
+        finally:
+            if file_path and not KEEP_UPLOADS and os.path.exists(file_path):
+                os.remove(file_path)
 
-        
-        job_store[job_id] = {
+        queries_source = parsed.get("queries_source", "llm")
+        # BEGIN IMMEDIATE may wait on another worker's write: keep it off the event loop
+        await run_in_threadpool(job_store.create, job_id, {
             "status": "waiting_for_linkedin",
-            "skills": skills,
-            "queries": queries,
-            "results": [],
-            "resume_text": resume_text
-        }
+            "skills": parsed["skills"],
+            "queries": parsed["queries"],
+            "queries_source": queries_source,
+            "locations": parsed.get("locations", []),
+            "country": parsed.get("country"),
+            "scrape_plan": _scrape_plan(
+                parsed["queries"], parsed["skills"], parsed.get("locations"), parsed.get("country")
+            ),
+            "results": PostColumns(),
+            "resume_text": parsed["text"]
+        }, RESULT_FIELDS)
 
+        JOB_TRANSITIONS.inc(status="waiting_for_linkedin")
         print(f"✅ Job {job_id} stored successfully\n")
 
+        # LLM queries that landed before the job existed
+        if queries_source == "pending_llm" and parsed["queries_source"] == "llm":
+            await run_in_threadpool(_apply_llm_queries, job_id, parsed["queries"])
+
         return {
             "success": True,
             "job_id": job_id,
-            "skills": skills,
-            "queries": queries,
+            "skills": parsed["skills"],
+            "queries": parsed["queries"],
+            "queries_source": parsed.get("queries_source", "llm"),
             "status": "waiting_for_linkedin",
             "message": "Resume processed successfully"
         }
@@ -182,23 +472,77 @@ async def process_resume(file: UploadFile = File(...)):
             detail=f"Error processing resume: {str(e)}"
         )
 
+def _pick_up_job(job_id: str):
+    """
+    The job as handed to the agent. A job still waiting_for_linkedin
+    moves to scraping in the transaction that reads it, so its queries
+    can no longer be swapped for late LLM ones. Later fetches (e.g. an
+    agent retrying) get the job as it is.
+    """
+    job = job_store.update(job_id, {"status": "scraping"}, ("status",), expect_status="waiting_for_linkedin")
+    if job is not None:
+        JOB_TRANSITIONS.inc(status="scraping")
+        return job
+    return job_store.get(job_id)
+
+
 @app.get("/api/results/{job_id}")
 async def get_job_for_agent(job_id: str):
     """
     Local agent fetches job details (skills, queries)
     """
-    if job_id not in job_store:
+    job = await run_in_threadpool(_pick_up_job, job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job ID not found")
-    
-    job = job_store[job_id]
+
     return {
         "job_id": job_id,
         "status": job["status"],
         "skills": job.get("skills", []),
-        "queries": job.get("queries", [])
+        "queries": job.get("queries", []),
+        "queries_source": job.get("queries_source", "llm"),
+        "scrape_plan": job.get("scrape_plan", [])
     }
 
 
+def _yield_samples(job: dict, query_stats) -> list:
+    """
+    (template, found, kept, seconds) for each of the agent's per-query
+    trace records, for query_yield.record. Records without a query or
+    with counts that are not non-negative numbers are skipped, so a bad
+    record cannot fail a submission.
+    """
+    samples = []
+    for stats in query_stats:
+        if not isinstance(stats, dict) or not isinstance(stats.get("query"), str) or not stats["query"]:
+            continue
+        try:
+            found = int(stats.get("checked", 0))
+            kept = int(stats.get("kept", 0))
+            seconds = float(stats.get("seconds", 0.0))
+        except (TypeError, ValueError, OverflowError):
+            continue
+        if found < 0 or kept < 0 or not math.isfinite(seconds) or seconds < 0:
+            continue
+        template = stats.get("template")
+        if not isinstance(template, str) or not template:
+            template = query_template(stats["query"], job.get("skills"), job.get("locations"), job.get("country"))
+        samples.append((template, found, kept, seconds))
+    return samples
+
+
+def _record_scrape_history(job_id: str, samples, traces):
+    """
+    Feeds the yield samples into the history and appends the agent's
+    trace records to TRACE_LOG. Blocking (file locks, rewrites and
+    rotation): call it from the threadpool.
+    """
+    query_yield.record(samples)
+    if samples:
+        print(f"📈 Recorded yield for {len(samples)} queries")
+    write_traces([t for t in traces if isinstance(t, dict)], TRACE_LOG, job_id=job_id)
+
+
 @app.post("/api/submit-results/{job_id}")
 async def submit_results(job_id: str, payload: dict = Body(...)):
     """
@@ -207,7 +551,8 @@ async def submit_results(job_id: str, payload: dict = Body(...)):
     print(f"\n📥 Receiving results for job: {job_id}")
     
     try:
-        if job_id not in job_store:
+        job = job_store.get(job_id)
+        if job is None:
             raise HTTPException(status_code=404, detail="Job ID not found")
 
         results = payload.get("results", [])
@@ -215,8 +560,29 @@ async def submit_results(job_id: str, payload: dict = Body(...)):
         if not isinstance(results, list):
             raise HTTPException(status_code=400, detail="Results must be a list")
 
-        job_store[job_id]["results"] = results
-        job_store[job_id]["status"] = "completed"
+        with STAGE_SECONDS.time(stage="scrape_submission"):
+            # Older agents send bare yield stats as "query_stats"
+            traces = payload.get("traces") or payload.get("query_stats") or []
+            if not isinstance(traces, list):
+                traces = []
+            samples = _yield_samples(job, traces)
+
+            # Columnar, interned storage instead of one dict per post
+            changes = {
+                "results": PostColumns.from_dicts(results),
+                "status": "completed",
+                "traces": traces,
+            }
+            # Pickling thousands of posts into the shared store stays off the event loop
+            updated = await run_in_threadpool(job_store.update, job_id, changes, ("status", "results", "result_count"))
+            if updated is None:
+                raise HTTPException(status_code=404, detail="Job ID not found")
+
+            await run_in_threadpool(_record_scrape_history, job_id, samples, traces)
+
+        JOB_TRANSITIONS.inc(status="completed")
+        RESULTS_RECEIVED.inc(len(results))
+        JOB_RESULT_COUNT.observe(len(results))
 
         print(f"✅ Stored {len(results)} results for job {job_id}\n")
 
@@ -233,26 +599,82 @@ async def submit_results(job_id: str, payload: dict = Body(...)):
         print(f"❌ Error submitting results: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _results_payload(job_id: str, job: dict, fields=None, cursor=None, limit=None, since_version=None) -> dict:
+    wanted, subfields = parse_fields(fields, RESULT_FIELDS)
+    if wanted is None:
+        wanted = set(RESULT_FIELDS)
+    if since_version is not None:
+        field_versions = job.get("field_versions", {})
+        wanted = {f for f in wanted if field_versions.get(f, 0) > since_version}
+
+    results_version = job.get("field_versions", {}).get("results", 0)
+    result_count = job.get("result_count", 0)
+    response = {
+        "success": True,
+        "job_id": job_id,
+        "version": job.get("version"),
+    }
+
+    if "results" in wanted:
+        offset = 0
+        if cursor:
+            issued_for, offset = decode_cursor(cursor)
+            if issued_for != results_version:
+                raise HTTPException(status_code=410, detail="Results changed since the cursor was issued")
+        # Posts live in the job's payload, loaded only when they are asked for
+        all_results = job_store.payload(job_id, job).get("results") or PostColumns()
+        end = offset + limit if limit else len(all_results)
+        response["results"] = all_results.to_dicts(offset, end, subfields.get("results"))
+        response["next_cursor"] = encode_cursor(results_version, end) if end < len(all_results) else None
+
+    values = {
+        "status": job["status"],
+        "skills": job.get("skills", []),
+        "queries": job.get("queries", []),
+        "queries_source": job.get("queries_source", "llm"),
+        "result_count": result_count,
+    }
+    response.update(project(values, wanted))
+    return response
+
+
 @app.get("/results/{job_id}")
-async def get_results(job_id: str):
+async def get_results(job_id: str, fields: str = None, cursor: str = None, limit: int = None,
+                      since_version: int = None, if_none_match: str = Header(None),
+                      accept_encoding: str = Header(None)):
     """
     Frontend polls this to get results
+
+    fields: comma-separated projection, e.g. "status,result_count" or
+        "results.author,results.post_url"
+    cursor/limit: page through results; follow `next_cursor`
+    since_version: only fields changed after that `version`
+    Answers 304 when If-None-Match carries the current ETag.
+    Completed jobs no longer change, so their bodies are served from
+    payload_cache already serialized and compressed.
     """
     try:
-        if job_id not in job_store:
+        job = job_store.get(job_id)
+        if job is None:
             raise HTTPException(status_code=404, detail="Job ID not found")
 
-        job = job_store[job_id]
-        
-        return {
-            "success": True,
-            "job_id": job_id,
-            "status": job["status"],
-            "skills": job.get("skills", []),
-            "queries": job.get("queries", []),
-            "results": job.get("results", []),
-            "result_count": len(job.get("results", []))
-        }
+        check_page_size(limit)
+
+        etag = make_etag(job_id, job.get("version"), fields, cursor, limit, since_version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        # Loading a payload the worker has not decoded yet unpickles every
+        # post: built in the threadpool, never on the event loop
+        def build():
+            return _results_payload(job_id, job, fields, cursor, limit, since_version)
+
+        if job["status"] == "completed":
+            key = (job_id, job.get("version"), "results", fields, cursor, limit, since_version)
+            return await payload_cache.aresponse(key, build, accept_encoding, headers)
+
+        return await run_in_threadpool(lambda: APIResponse(build(), headers=headers))
         
     except HTTPException:
         raise
@@ -260,32 +682,51 @@ async def get_results(job_id: str):
         print(f"❌ Error getting results: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _rank_context(job: dict) -> dict:
+    # Resume signals the ranker boosts posts by, besides text similarity
+    return {"skills": job.get("skills", []), "locations": job.get("locations", []), "country": job.get("country")}
+
+
 @app.get("/rank/{job_id}")
-async def rank_results(job_id: str, top_k: int = 20):
+async def rank_results(job_id: str, top_k: int = 20, weights: str = None, accept_encoding: str = Header(None)):
     """
-    Rank results by relevance to resume
+    Rank results by relevance to resume: text similarity plus skill,
+    location and freshness boosts. `weights` overrides the default signal
+    weights, e.g. "skills:0.2,freshness:0" (see ranker.DEFAULT_WEIGHTS).
     """
     try:
-        if job_id not in job_store:
+        job = job_store.get(job_id)
+        if job is None:
             raise HTTPException(status_code=404, detail="Job ID not found")
 
-        job = job_store[job_id]
-        
-        if not job.get("results"):
+        if not job.get("result_count"):
             raise HTTPException(status_code=400, detail="No results to rank yet")
 
-        resume_text = job.get("resume_text", "")
-        results = job["results"]
 
         try:
-            from ranker import rank_posts
-            ranked = rank_posts(resume_text, results, top_k=top_k)
-            
-            return {
-                "success": True,
-                "ranked_results": ranked,
-                "count": len(ranked)
-            }
+            from ranker import parse_weights, rank_posts
+
+            try:
+                signal_weights = parse_weights(weights)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            def build():
+                payload = job_store.payload(job_id, job)
+                with STAGE_SECONDS.time(stage="ranking"):
+                    ranked = rank_posts(payload.get("resume_text", ""), payload.get("results", []), top_k=top_k,
+                                        weights=signal_weights, **_rank_context(job))
+                return {
+                    "success": True,
+                    "ranked_results": ranked,
+                    "count": len(ranked)
+                }
+
+            # Payload loading, TF-IDF and signal scoring are CPU-bound: built in the threadpool
+            if job["status"] == "completed":
+                key = (job_id, job.get("version"), "rank", top_k, tuple(sorted(signal_weights.items())))
+                return await payload_cache.aresponse(key, build, accept_encoding)
+            return await run_in_threadpool(build)
         except ImportError as ie:
             print(f"❌ Ranking import error: {ie}")
             raise HTTPException(status_code=500, detail="Ranking module not available. Install scikit-learn.")
@@ -296,28 +737,269 @@ async def rank_results(job_id: str, top_k: int = 20):
         print(f"❌ Error ranking results: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _rank_batch(job_ids, top_k: int, pool: bool, weights: dict) -> dict:
+    jobs = []
+    missing = []
+    without_results = []
+    for job_id in job_ids:
+        job = job_store.get(job_id)
+        if job is None:
+            missing.append(job_id)
+            continue
+        payload = job_store.payload(job_id, job)
+        if not payload.get("results"):
+            without_results.append(job_id)
+            continue
+        jobs.append((job_id, payload.get("resume_text", ""), payload["results"], _rank_context(job)))
+
+    from ranker import rank_many
+
+    with STAGE_SECONDS.time(stage="batch_ranking"):
+        ranked = rank_many([job[1:] for job in jobs], top_k=top_k, pool=pool, weights=weights)
+
+    return {
+        "success": True,
+        "ranked": {
+            job[0]: {"ranked_results": results, "count": len(results)}
+            for job, results in zip(jobs, ranked)
+        },
+        "count": len(jobs),
+        "missing": missing,
+        "without_results": without_results,
+    }
+
+
+def _rank_completed(top_k: int, pool: bool, weights: dict) -> dict:
+    """
+    _rank_batch over every completed job, MAX_BATCH_RANK_JOBS at a time
+    so no single model holds the posts of all of them. With pool, each
+    resume is ranked against the posts of the jobs in its own chunk.
+    """
+    job_ids = [job_id for job_id, job in job_store.items() if job["status"] == "completed"]
+    merged = {"success": True, "ranked": {}, "count": 0, "missing": [], "without_results": []}
+    for start in range(0, len(job_ids), MAX_BATCH_RANK_JOBS):
+        batch = _rank_batch(job_ids[start:start + MAX_BATCH_RANK_JOBS], top_k, pool, weights)
+        merged["ranked"].update(batch["ranked"])
+        merged["count"] += batch["count"]
+        merged["missing"].extend(batch["missing"])
+        merged["without_results"].extend(batch["without_results"])
+    return merged
+
+
+@app.post("/rank/batch")
+async def rank_batch(payload: dict = Body({})):
+    """
+    Ranks many jobs in one call, e.g. a nightly re-rank of every user:
+    one TF-IDF model is fitted for all of them and scored with a single
+    sparse matrix product (see ranker.rank_many).
+
+    Body: {"job_ids": [...], "top_k": 20, "pool": false, "weights": {...}}
+    job_ids defaults to every completed job, ranked MAX_BATCH_RANK_JOBS
+    at a time; an explicit list may hold at most that many. pool ranks
+    each resume against the posts of all selected jobs (of its chunk,
+    for the default) instead of only its own. weights overrides the
+    signal weights, as in /rank.
+    """
+    job_ids = payload.get("job_ids")
+    top_k = payload.get("top_k", 20)
+    pool = bool(payload.get("pool", False))
+
+    try:
+        from ranker import parse_weights
+        weights = parse_weights(payload.get("weights"))
+    except ImportError as ie:
+        print(f"❌ Ranking import error: {ie}")
+        raise HTTPException(status_code=500, detail="Ranking module not available. Install scikit-learn.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if job_ids is not None and (not isinstance(job_ids, list) or not all(isinstance(j, str) for j in job_ids)):
+        raise HTTPException(status_code=400, detail="job_ids must be a list of job IDs")
+    if not isinstance(top_k, int) or top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be a positive integer")
+    if job_ids is not None and len(job_ids) > MAX_BATCH_RANK_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_RANK_JOBS} jobs per batch")
+
+    try:
+        # Fitting one model over every job's posts is CPU-bound: keep it off the event loop
+        if job_ids is None:
+            return await run_in_threadpool(_rank_completed, top_k, pool, weights)
+        return await run_in_threadpool(_rank_batch, list(dict.fromkeys(job_ids)), top_k, pool, weights)
+    except ImportError as ie:
+        print(f"❌ Ranking import error: {ie}")
+        raise HTTPException(status_code=500, detail="Ranking module not available. Install scikit-learn.")
+    except Exception as e:
+        print(f"❌ Error batch ranking: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _list_jobs(fields, cursor, limit, since_version, if_none_match):
+    data_version = job_store.version()
+    etag = make_etag(data_version, len(job_store), fields, cursor, limit, since_version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    wanted, _ = parse_fields(fields, JOB_FIELDS)
+    wanted = wanted or set(DEFAULT_JOB_FIELDS)
+    after = decode_cursor(cursor)[1] if cursor else 0
+
+    jobs = {}
+    last_created = None
+    has_more = False
+    for job_id, job in job_store.items():
+        if job.get("created_version", 0) <= after:
+            continue
+        if since_version is not None and job.get("version", 0) <= since_version:
+            continue
+        if limit and len(jobs) >= limit:
+            has_more = True
+            break
+
+        values = {
+            "status": job["status"],
+            "skills": job.get("skills", []),
+            "result_count": job.get("result_count", 0),
+            "queries_source": job.get("queries_source", "llm"),
+            "locations": job.get("locations", []),
+            "country": job.get("country"),
+            "version": job.get("version"),
+        }
+        jobs[job_id] = project(values, wanted)
+        last_created = job.get("created_version", 0)
+
+    return APIResponse({
+        "success": True,
+        "total_jobs": len(job_store),
+        "version": data_version,
+        "jobs": jobs,
+        "next_cursor": encode_cursor(data_version, last_created) if has_more else None
+    }, headers=headers)
+
+
 @app.get("/jobs")
-async def get_all_jobs():
+async def get_all_jobs(fields: str = None, cursor: str = None, limit: int = None,
+                       since_version: int = None, if_none_match: str = Header(None)):
     """
     List all jobs
+
+    fields: per-job projection (default status,skills,result_count)
+    cursor/limit: page through jobs in creation order
+    since_version: only jobs changed after that `version`
+    Answers 304 when If-None-Match carries the current ETag.
     """
     try:
-        return {
-            "success": True,
-            "total_jobs": len(job_store),
-            "jobs": {
-                job_id: {
-                    "status": job["status"],
-                    "skills": job.get("skills", []),
-                    "result_count": len(job.get("results", []))
-                }
-                for job_id, job in job_store.items()
-            }
-        }
+        check_page_size(limit)
+        # Reading and decoding every job's metadata blocks: keep it off the event loop
+        return await run_in_threadpool(_list_jobs, fields, cursor, limit, since_version, if_none_match)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/export/results")
+async def export_results(fmt: str = Query("arrow", alias="format"), since_version: int = None):
+    """
+    Streams every job's posts as one columnar archive: Arrow IPC stream
+    (default) or Parquet. since_version limits it to jobs changed after
+    that version, for incremental exports.
+    """
+    if fmt not in results_archive.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(results_archive.FORMATS)}")
+    if results_archive.pa is None:
+        raise HTTPException(status_code=501, detail="Columnar export needs pyarrow: pip install pyarrow")
+
+    data_version = job_store.version()
+    selected = [
+        job_id for job_id, job in job_store.items()
+        if job.get("result_count") and (since_version is None or job.get("version", 0) > since_version)
+    ]
+
+    def jobs():
+        # One job's posts decoded at a time; jobs expired meanwhile are skipped
+        for job_id in selected:
+            results = job_store.payload(job_id).get("results")
+            if results:
+                yield job_id, results
+
+    media_type = results_archive.ARROW_MEDIA_TYPE if fmt == "arrow" else results_archive.PARQUET_MEDIA_TYPE
+
+    return StreamingResponse(
+        results_archive.stream_archive(jobs(), fmt),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="results.{fmt}"',
+            "X-Data-Version": str(data_version),
+        }
+    )
+
+
+async def _follow_job_events():
+    """
+    Applies job changes published by other workers to this worker's
+    caches: superseded payload_cache bodies and decoded jobs are dropped.
+    """
+    after = await run_in_threadpool(job_store.last_event)
+    while True:
+        await asyncio.sleep(EVENT_POLL_SECONDS)
+        try:
+            events = await run_in_threadpool(job_store.events, after, JOBS_CHANNEL)
+        except Exception as e:
+            print(f"⚠️ Could not read job events: {e}")
+            continue
+        for seq, _, message in events:
+            after = seq
+            payload_cache.discard(message["job_id"], before_version=message["version"])
+            job_store.forget(message["job_id"], before_version=message["version"])
+
+
+def _sweep_uploads(max_age: float = UPLOAD_MAX_AGE_SECONDS) -> int:
+    """
+    Deletes files in UPLOAD_DIR not modified for `max_age` seconds.
+    Uploads being streamed are written continuously, so they are never
+    old enough to match.
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass  # another worker's sweeper got there first
+    return removed
+
+
+def _sweep():
+    expired = job_store.expire(JOB_TTL_SECONDS)
+    for job_id in expired:
+        payload_cache.discard(job_id)
+    removed = 0 if KEEP_UPLOADS else _sweep_uploads()
+    return expired, removed
+
+
+async def _sweep_periodically():
+    """
+    Expires jobs past their TTL and clears stale uploads every
+    SWEEP_INTERVAL_SECONDS. Other workers learn about the deletions
+    through the job events.
+    """
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+        try:
+            expired, removed = await run_in_threadpool(_sweep)
+        except Exception as e:
+            print(f"⚠️ Sweep failed: {e}")
+            continue
+        JOBS_EXPIRED.inc(len(expired))
+        UPLOADS_SWEPT.inc(removed)
+        if expired or removed:
+            print(f"🧹 Expired {len(expired)} jobs, removed {removed} stale uploads")
+
+
 @app.on_event("startup")
 async def startup_event():
     print("\n" + "="*60)
@@ -326,22 +1008,21 @@ async def startup_event():
     print(f"📁 Upload directory: {UPLOAD_DIR}")
     print(f"🌐 Frontend directory: {FRONTEND_DIR}")
     print(f"🤖 LLM Backend: Ollama (Local)")
+    print(f"🗄️  Shared job state: {job_store.path} (worker {os.getpid()})")
+
+    app.state.job_events = asyncio.create_task(_follow_job_events())
+    app.state.sweeper = asyncio.create_task(_sweep_periodically())
     
     
-    try:
-        import requests
-        response = requests.get("http://localhost:11434/api/tags", timeout=2)
-        if response.status_code == 200:
-            models = response.json().get("models", [])
-            model_names = [m.get("name") for m in models]
-            print(f"✅ Ollama is running")
-            if model_names:
-                print(f"📦 Available models: {', '.join(model_names[:3])}")
-            else:
-                print("⚠️  No models found. Run: ollama pull llama2")
+    client = get_client()
+    if await run_in_threadpool(client.probe):
+        model_names = client.list_models()
+        print(f"✅ Ollama is running at {client.base_url}")
+        if model_names:
+            print(f"📦 Available models: {', '.join(model_names[:3])}")
         else:
-            print("⚠️  Ollama not responding properly")
-    except Exception as e:
+            print("⚠️  No models found. Run: ollama pull llama2")
+    else:
         print("❌ Ollama not running!")
         print("   Start it with: ollama serve")
         print("   Then: ollama pull llama2")
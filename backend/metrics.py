@@ -0,0 +1,201 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Seconds; covers fast cache hits up to slow LLM generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = []
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, ("le", _format_value(float(bound))))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                base = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{base} {_format_value(float(series[-2]))}")
+                lines.append(f"{self.name}_count{base} {series[-1]}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """
+    Value computed at scrape time, for state that already lives elsewhere
+    (cache stats, job_store). `callback` returns {label values tuple: value}.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), callback=None, kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def render(self):
+        lines = self.header()
+        try:
+            values = self.callback() if self.callback else {}
+        except Exception:
+            values = {}
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+def render() -> str:
+    """
+    All registered metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+
+
+def _route_label(scope) -> str:
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is not None and app is not None:
+        for route in getattr(app, "routes", []):
+            if getattr(route, "endpoint", None) is endpoint:
+                return route.path
+    # Unmatched paths are collapsed so arbitrary URLs cannot blow up cardinality
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request, labelled
+    by route template (not raw path) and status code.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=_route_label(scope),
+                status=status[0],
+            )
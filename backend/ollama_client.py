@@ -0,0 +1,208 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+
+# Keep-alive pool shared by every request to Ollama
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+# Health status is cached instead of probing /api/tags before every call.
+# After a failed probe the next probe waits HEALTH_BACKOFF_BASE seconds,
+# doubling per consecutive failure up to HEALTH_BACKOFF_MAX.
+HEALTH_TTL = 30
+HEALTH_BACKOFF_BASE = 2
+HEALTH_BACKOFF_MAX = 60
+
+GENERATE_TIMEOUT = 60
+
+# Generations the Ollama server runs at once (its OLLAMA_NUM_PARALLEL)
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+
+# Streaming: max gap between two chunks before the read is abandoned
+STREAM_READ_TIMEOUT = 15
+
+
+def _set_read_timeout(response, seconds: float):
+    # urllib3 puts the read timeout on the socket once, when the request
+    # is sent; setting it again bounds the next read
+    connection = response.raw.connection
+    if connection is not None and connection.sock is not None:
+        connection.sock.settimeout(seconds)
+
+
+class OllamaClient:
+    """
+    Pooled client for the Ollama HTTP API with a cached health status.
+    """
+
+    def __init__(self, base_url: str = OLLAMA_URL):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._healthy = None
+        self._models = []
+        self._next_probe = 0.0
+        self._failures = 0
+
+    def _mark_healthy(self, models):
+        with self._lock:
+            self._healthy = True
+            self._models = models
+            self._failures = 0
+            self._next_probe = time.monotonic() + HEALTH_TTL
+
+    def _mark_unhealthy(self):
+        with self._lock:
+            self._healthy = False
+            self._failures += 1
+            backoff = min(HEALTH_BACKOFF_BASE * 2 ** (self._failures - 1), HEALTH_BACKOFF_MAX)
+            self._next_probe = time.monotonic() + backoff
+
+    def probe(self, timeout: float = 2) -> bool:
+        """
+        Hits /api/tags now and updates the cached health status.
+        """
+        try:
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=timeout)
+            if response.status_code != 200:
+                self._mark_unhealthy()
+                return False
+            models = [m.get("name") for m in response.json().get("models", [])]
+        except Exception:
+            self._mark_unhealthy()
+            return False
+
+        self._mark_healthy(models)
+        return True
+
+    def is_available(self) -> bool:
+        """
+        Cached health check; only probes once the cached status expires.
+        """
+        if time.monotonic() < self._next_probe:
+            return bool(self._healthy)
+        return self.probe()
+
+    async def ais_available(self) -> bool:
+        """
+        is_available for the event loop: when a probe is due it runs on the
+        default executor instead of blocking the loop for up to 2s.
+        """
+        if time.monotonic() < self._next_probe:
+            return bool(self._healthy)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.probe)
+
+    def list_models(self):
+        if self.is_available():
+            return list(self._models)
+        return []
+
+    def generate(self, prompt: str, model: str, options: dict = None, timeout: float = GENERATE_TIMEOUT):
+        """
+        Calls /api/generate (non-streaming) and returns the response text.
+        Raises requests exceptions on transport errors and ValueError on a
+        non-200 status.
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/generate",
+                json={
+                    "model": model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "options": options or {},
+                },
+                timeout=timeout
+            )
+        except requests.exceptions.ConnectionError:
+            self._mark_unhealthy()
+            raise
+
+        if response.status_code != 200:
+            raise ValueError(f"Ollama returned status {response.status_code}")
+
+        return response.json().get("response", "").strip()
+
+    def generate_stream(self, prompt: str, model: str, options: dict = None, read_timeout: float = STREAM_READ_TIMEOUT,
+                        deadline: float = None):
+        """
+        Calls /api/generate with streaming on and yields response fragments
+        as they arrive. Closing the generator closes the connection, which
+        makes Ollama stop generating. A gap of more than `read_timeout`
+        seconds between chunks, or reaching `deadline` (a time.monotonic()
+        value), raises requests.exceptions.ReadTimeout: each read waits at
+        most for the time left before the deadline.
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/generate",
+                json={
+                    "model": model,
+                    "prompt": prompt,
+                    "stream": True,
+                    "options": options or {},
+                },
+                timeout=(5, read_timeout),
+                stream=True
+            )
+        except requests.exceptions.ConnectionError:
+            self._mark_unhealthy()
+            raise
+
+        with response:
+            if response.status_code != 200:
+                raise ValueError(f"Ollama returned status {response.status_code}")
+
+            try:
+                lines = response.iter_lines()
+                while True:
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise requests.exceptions.ReadTimeout("Ollama stream deadline reached")
+                        _set_read_timeout(response, min(read_timeout, remaining))
+                    line = next(lines, None)
+                    if line is None:
+                        break
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+            except requests.exceptions.ConnectionError as e:
+                # requests reports a read timeout mid-body as a ConnectionError
+                if e.args and isinstance(e.args[0], ReadTimeoutError):
+                    raise requests.exceptions.ReadTimeout(e) from e
+                raise
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OllamaClient:
+    """
+    Returns the process-wide shared client.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OllamaClient()
+    return _client
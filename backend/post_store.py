@@ -0,0 +1,129 @@
+import sys
+
+
+POST_FIELDS = ("query", "author", "content", "post_url", "links", "posted_at")
+
+
+def _text(value) -> str:
+    return value if isinstance(value, str) else ("" if value is None else str(value))
+
+
+def _timestamp(value):
+    # Unix time the post was published, None when the scraper could not tell
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value) if value >= 0 else None
+
+
+def _links(values, post_url: str) -> tuple:
+    if not isinstance(values, (list, tuple)):
+        return ()
+    # links[0] is usually the post URL itself: share that string object
+    return tuple(post_url if link == post_url else _text(link) for link in values)
+
+
+class Post:
+    """
+    One scraped post. Slots instead of a per-post dict; query and author
+    are interned since a job repeats a dozen queries and a few authors
+    across thousands of posts.
+    """
+
+    __slots__ = POST_FIELDS
+
+    def __init__(self, query: str, author: str, content: str, post_url: str = "", links=(), posted_at=None):
+        self.query = sys.intern(query)
+        self.author = sys.intern(author)
+        self.content = content
+        self.post_url = post_url
+        self.links = links
+        self.posted_at = posted_at
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Post":
+        post_url = _text(data.get("post_url"))
+        return cls(_text(data.get("query")), _text(data.get("author")), _text(data.get("content")),
+                   post_url, _links(data.get("links"), post_url), _timestamp(data.get("posted_at")))
+
+    def to_dict(self) -> dict:
+        return {
+            "query": self.query,
+            "author": self.author,
+            "content": self.content,
+            "post_url": self.post_url,
+            "links": list(self.links),
+            "posted_at": self.posted_at,
+        }
+
+
+class PostColumns:
+    """
+    Column-oriented posts of one job: one list per field instead of one
+    dict per post. Ranking reads `contents` directly; the API builds
+    dicts only for the page it returns.
+    """
+
+    __slots__ = ("queries", "authors", "contents", "post_urls", "links", "posted_at")
+
+    def __init__(self):
+        self.queries = []
+        self.authors = []
+        self.contents = []
+        self.post_urls = []
+        self.links = []
+        self.posted_at = []
+
+    @classmethod
+    def from_dicts(cls, posts) -> "PostColumns":
+        """
+        Builds the columns from scraped post dicts (as submitted by the
+        agent). Entries that are not dicts are skipped; keys other than
+        POST_FIELDS are not kept.
+        """
+        columns = cls()
+        for post in posts:
+            if isinstance(post, dict):
+                columns.append(Post.from_dict(post))
+        return columns
+
+    def append(self, post: Post):
+        self.queries.append(post.query)
+        self.authors.append(post.author)
+        self.contents.append(post.content)
+        self.post_urls.append(post.post_url)
+        self.links.append(post.links)
+        self.posted_at.append(post.posted_at)
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def __getitem__(self, index: int) -> Post:
+        return Post(self.queries[index], self.authors[index], self.contents[index],
+                    self.post_urls[index], self.links[index], self.posted_at[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_dicts(self, start: int = 0, end: int = None, fields=None):
+        """
+        Posts [start:end] as API dicts, limited to `fields` if given.
+        """
+        end = len(self) if end is None else min(end, len(self))
+        wanted = [f for f in POST_FIELDS if fields is None or f in fields]
+        columns = {
+            "query": self.queries,
+            "author": self.authors,
+            "content": self.contents,
+            "post_url": self.post_urls,
+            "links": self.links,
+            "posted_at": self.posted_at,
+        }
+        out = []
+        for i in range(start, end):
+            post = {}
+            for field in wanted:
+                value = columns[field][i]
+                post[field] = list(value) if field == "links" else value
+            out.append(post)
+        return out
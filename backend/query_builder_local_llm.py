@@ -1,32 +1,72 @@
 import requests
+import asyncio
+import hashlib
 import json
+import time
 
+from disk_cache import DiskCache
+from ollama_client import get_client, OLLAMA_NUM_PARALLEL, STREAM_READ_TIMEOUT
+from request_batcher import RequestBatcher
+from query_planner import plan_queries
+from text_normalizer import normalize_skill
 
-def normalize_skill(skill):
-    """Normalize skill names for better search"""
-    return (
-        skill.lower()
-        .replace(".js", "")
-        .replace(".", "")
-        .strip()
-    )
 
+OLLAMA_MODEL = "llama3.1:8b"
+OLLAMA_OPTIONS = {
+    "temperature": 0.3,
+    "top_p": 0.9,
+    "num_predict": 250,
+}
 
-def generate_queries_with_ollama(skills, locations=None, country=None, max_queries=12):
+# Stream tokens and stop as soon as the JSON array closes; give up (keeping
+# whatever queries were already parsed, uncached) after STREAM_DEADLINE
+# seconds. Every read waits at most for the time left, so a stalled or
+# trickling stream cannot outlive the deadline
+OLLAMA_STREAM = True
+STREAM_DEADLINE = 30
+
+# Template candidates generated per query slot before the planner picks
+# the most diverse subset
+QUERY_POOL_FACTOR = 3
+
+# Upload latency budget for the LLM: past this many seconds the template
+# queries are used and the LLM result is merged into the job when it lands
+LLM_LATENCY_BUDGET = 3.0
+
+# Generated queries keyed by the normalized prompt inputs
+LLM_CACHE_DIR = "cache/llm"
+LLM_CACHE_TTL = 7 * 24 * 3600
+LLM_CACHE_MAX_BYTES = 10 * 1024 * 1024
+
+llm_cache = DiskCache(LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL)
+
+
+def _prompt_locations(locations, country):
+    # build_ollama_prompt lists two cities after a country, else only the first location
+    return (locations or [])[:2] if country else (locations or [])[:1]
+
+
+def llm_cache_key(skills, locations=None, country=None, max_queries=12):
     """
-    Use Ollama to generate smart LinkedIn search queries with location AND country
+    Cache key over exactly the inputs that reach the prompt, normalized so
+    that skill order and casing do not matter. Locations are kept in
+    prompt order, since which one comes first can change the prompt.
+    """
+    key = {
+        "skills": sorted({normalize_skill(s) for s in skills[:10]}),
+        "locations": [loc.lower().strip() for loc in _prompt_locations(locations, country)],
+        "country": country.lower().strip() if country else None,
+        "max_queries": max_queries,
+        "model": OLLAMA_MODEL,
+        "options": OLLAMA_OPTIONS,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def build_ollama_prompt(skills, locations=None, country=None, max_queries=12):
+    """
+    Build the query-generation prompt. Returns (prompt, location_context).
     """
-    try:
-        # Check if Ollama is running
-        health_check = requests.get("http://localhost:11434/api/tags", timeout=2)
-        if health_check.status_code != 200:
-            print("⚠️  Ollama is not responding")
-            return None
-    except Exception:
-        print("⚠️  Cannot connect to Ollama (is it running?)")
-        return None
-    
-    # Create prompt for Ollama
     skills_str = ", ".join(skills[:10])  # Use top 10 skills
     
     # Build location context
@@ -57,78 +97,257 @@ Example for India: ["python developer hiring India", "react intern opening Banga
 
 JSON array:"""
 
+    return prompt, location_context
+
+
+def parse_ollama_queries(ollama_text, max_queries=12):
+    """
+    Pull the JSON array of queries out of raw model output.
+    Returns None if no usable array (at least 3 queries) is found.
+    """
+    print(f"📄 Ollama raw response:\n{ollama_text[:200]}...\n")
+   
+    if "```json" in ollama_text:
+        ollama_text = ollama_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in ollama_text:
+        parts = ollama_text.split("```")
+        if len(parts) >= 3:
+            ollama_text = parts[1].strip()
+    
+    if ollama_text.startswith("json"):
+        ollama_text = ollama_text[4:].strip()
+    
+    start_idx = ollama_text.find("[")
+    end_idx = ollama_text.rfind("]")
+    
+    if start_idx == -1 or end_idx == -1:
+        print("⚠️  Could not find JSON array in response")
+        return None
+    
+    json_str = ollama_text[start_idx:end_idx + 1]
     try:
-        print(f"🤖 Querying Ollama with location context: {location_context}...")
-        
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "llama3.1:8b",
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,
-                    "top_p": 0.9,
-                    "num_predict": 250,
-                }
-            },
-            timeout=60
-        )
-        
-        if response.status_code != 200:
-            print(f"⚠️  Ollama returned status {response.status_code}")
-            return None
-        
-        data = response.json()
-        ollama_text = data.get("response", "").strip()
-        
-        print(f"📄 Ollama raw response:\n{ollama_text[:200]}...\n")
-       
-        if "```json" in ollama_text:
-            ollama_text = ollama_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in ollama_text:
-            parts = ollama_text.split("```")
-            if len(parts) >= 3:
-                ollama_text = parts[1].strip()
-        
-        if ollama_text.startswith("json"):
-            ollama_text = ollama_text[4:].strip()
-        
-        start_idx = ollama_text.find("[")
-        end_idx = ollama_text.rfind("]")
-        
-        if start_idx == -1 or end_idx == -1:
-            print("⚠️  Could not find JSON array in response")
-            return None
-        
-        json_str = ollama_text[start_idx:end_idx + 1]
         queries = json.loads(json_str)
-        
-        if not isinstance(queries, list):
-            print("⚠️  Response is not a list")
-            return None
-        
-        valid_queries = []
-        for q in queries:
-            if isinstance(q, str) and len(q.strip()) > 0:
-                valid_queries.append(q.strip().lower())
-        
-        if len(valid_queries) < 3:
-            print(f"⚠️  Only got {len(valid_queries)} valid queries")
-            return None
-        
-        print(f"✅ Generated {len(valid_queries)} queries with Ollama")
-        return valid_queries[:max_queries]
-        
     except json.JSONDecodeError as e:
         print(f"⚠️  Failed to parse JSON: {e}")
         return None
+    
+    if not isinstance(queries, list):
+        print("⚠️  Response is not a list")
+        return None
+    
+    valid_queries = []
+    for q in queries:
+        if isinstance(q, str) and len(q.strip()) > 0:
+            valid_queries.append(q.strip().lower())
+    
+    if len(valid_queries) < 3:
+        print(f"⚠️  Only got {len(valid_queries)} valid queries")
+        return None
+    
+    print(f"✅ Generated {len(valid_queries)} queries with Ollama")
+    return valid_queries[:max_queries]
+
+
+class QueryStreamParser:
+    """
+    Incremental parser for a JSON array of strings arriving token by token.
+
+    Text before the first '[' is ignored. Each complete top-level string is
+    collected as soon as its closing quote arrives; `done` is set when the
+    array closes or `max_queries` queries have been seen.
+    """
+
+    def __init__(self, max_queries=12):
+        self.max_queries = max_queries
+        self.queries = []
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buf = []
+
+    def feed(self, text):
+        for ch in text:
+            if self.done:
+                break
+
+            if self._depth == 0:
+                if ch == "[":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._emit("".join(self._buf[:-1]))
+                    self._buf = []
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "[":
+                self._depth += 1
+            elif ch == "]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+
+        return self.done
+
+    def _emit(self, raw):
+        if self._depth != 1:
+            return
+        try:
+            query = json.loads(f'"{raw}"')
+        except ValueError:
+            return
+        query = query.strip().lower()
+        if query:
+            self.queries.append(query)
+            if len(self.queries) >= self.max_queries:
+                self.done = True
+
+
+def stream_queries_from_ollama(client, prompt, max_queries=12, deadline=STREAM_DEADLINE):
+    """
+    Streams the generation and stops early once the JSON array is complete.
+
+    Returns (queries, complete): on timeout the queries parsed so far, with
+    complete False. Returns None if fewer than 3 usable queries came back.
+    """
+    parser = QueryStreamParser(max_queries)
+    tokens = 0
+    timed_out = False
+
+    stream = client.generate_stream(prompt, model=OLLAMA_MODEL, options=OLLAMA_OPTIONS,
+                                    read_timeout=STREAM_READ_TIMEOUT, deadline=time.monotonic() + deadline)
+    try:
+        for fragment in stream:
+            tokens += 1
+            if parser.feed(fragment):
+                break
     except requests.exceptions.Timeout:
-        print("⚠️  Ollama request timed out")
+        timed_out = True
+    finally:
+        stream.close()
+
+    if timed_out:
+        print(f"⚠️  Ollama stream timed out, keeping {len(parser.queries)} partial queries")
+    else:
+        print(f"📄 Ollama stream stopped after {tokens} chunks (array complete: {parser.done})")
+
+    if len(parser.queries) < 3:
+        print(f"⚠️  Only got {len(parser.queries)} valid queries")
         return None
-    except Exception as e:
-        print(f"⚠️  Ollama error: {e}")
+
+    print(f"✅ Generated {len(parser.queries)} queries with Ollama")
+    return parser.queries[:max_queries], parser.done and not timed_out
+
+
+def _request_queries(client, prompt, max_queries=12):
+    """
+    (queries, complete) from Ollama, or None when it returned too few.
+    """
+    if OLLAMA_STREAM:
+        return stream_queries_from_ollama(client, prompt, max_queries)
+
+    ollama_text = client.generate(prompt, model=OLLAMA_MODEL, options=OLLAMA_OPTIONS)
+    queries = parse_ollama_queries(ollama_text, max_queries)
+    return (queries, True) if queries else None
+
+
+query_batcher = RequestBatcher(_request_queries, max_parallel=OLLAMA_NUM_PARALLEL)
+
+
+def _cached_queries(cache_key):
+    cached = llm_cache.get(cache_key)
+    if cached:
+        print(f"⚡ LLM cache hit ({llm_cache.stats()['hit_rate']:.0%} hit rate)")
+    return cached
+
+
+def _ollama_prompt(skills, locations, country, max_queries):
+    prompt, location_context = build_ollama_prompt(skills, locations, country, max_queries)
+    print(f"🤖 Querying Ollama with location context: {location_context}...")
+    return prompt
+
+
+def _store_queries(cache_key, generated):
+    # Partial (timed-out) generations are used once but never cached
+    if not generated:
         return None
+    queries, complete = generated
+    if complete:
+        llm_cache.set(cache_key, queries)
+    return queries
+
+
+def _generation_failed(error):
+    if isinstance(error, requests.exceptions.Timeout):
+        print("⚠️  Ollama request timed out")
+    else:
+        print(f"⚠️  Ollama error: {error}")
+    return None
+
+
+def _ollama_unavailable():
+    print("⚠️  Cannot connect to Ollama (is it running?)")
+    return None
+
+
+# The sync and async generators share every step above; they differ only
+# in how they check health and send the request
+
+
+def generate_queries_with_ollama(skills, locations=None, country=None, max_queries=12):
+    """
+    Use Ollama to generate smart LinkedIn search queries with location AND country
+    """
+    cache_key = llm_cache_key(skills, locations, country, max_queries)
+    cached = _cached_queries(cache_key)
+    if cached:
+        return cached
+
+    client = get_client()
+
+    # Cached health status - no /api/tags round trip per resume
+    if not client.is_available():
+        return _ollama_unavailable()
+
+    prompt = _ollama_prompt(skills, locations, country, max_queries)
+    try:
+        return _store_queries(cache_key, _request_queries(client, prompt, max_queries))
+    except Exception as e:
+        return _generation_failed(e)
+
+
+async def agenerate_queries_with_ollama(skills, locations=None, country=None, max_queries=12):
+    """
+    Async variant of generate_queries_with_ollama for FastAPI handlers.
+    """
+    loop = asyncio.get_running_loop()
+    cache_key = llm_cache_key(skills, locations, country, max_queries)
+    # Cache reads and writes touch disk: keep them off the event loop
+    cached = await loop.run_in_executor(None, _cached_queries, cache_key)
+    if cached:
+        return cached
+
+    client = get_client()
+
+    if not await client.ais_available():
+        return _ollama_unavailable()
+
+    prompt = _ollama_prompt(skills, locations, country, max_queries)
+    try:
+        # Concurrent jobs are micro-batched: identical prompts share one
+        # generation and distinct ones run up to OLLAMA_NUM_PARALLEL at once
+        generated = await query_batcher.submit(cache_key, client, prompt, max_queries)
+        return await loop.run_in_executor(None, _store_queries, cache_key, generated)
+    except Exception as e:
+        return _generation_failed(e)
 
 
 def build_fallback_queries(skills, locations=None, country=None, max_queries=12):
@@ -223,6 +442,15 @@ def build_fallback_queries(skills, locations=None, country=None, max_queries=12)
     return queries[:max_queries]
 
 
+def build_planned_fallback_queries(skills, locations=None, country=None, max_queries=12):
+    """
+    Template queries from a larger candidate pool, reduced by the query
+    planner to a diverse set covering as many skills as possible.
+    """
+    pool = build_fallback_queries(skills, locations, country, max_queries * QUERY_POOL_FACTOR)
+    return plan_queries(pool, skills, locations, country, budget=max_queries)
+
+
 def build_search_queries(skills, locations=None, country=None, resume_text=None, max_queries=12):
     """
     Main function: Try Ollama first, fallback to templates
@@ -250,9 +478,71 @@ def build_search_queries(skills, locations=None, country=None, resume_text=None,
     
     if ollama_queries and len(ollama_queries) >= 3:
         print("✅ Using Ollama-generated queries")
-        return ollama_queries
+        return plan_queries(ollama_queries, skills, locations, country, budget=max_queries)
     
     print("⚠️  Using fallback query generation...")
-    fallback_queries = build_fallback_queries(skills, locations, country, max_queries)
+    fallback_queries = build_planned_fallback_queries(skills, locations, country, max_queries)
+    
+    return fallback_queries
+
+def merge_queries(primary, secondary, max_queries=12):
+    """
+    Primary queries first, then secondary ones not already present.
+    """
+    merged = []
+    seen = set()
+    for query in list(primary) + list(secondary):
+        if query not in seen:
+            seen.add(query)
+            merged.append(query)
+    return merged[:max_queries]
+
+
+async def abuild_search_queries_hedged(skills, locations=None, country=None, max_queries=12,
+                                       budget=LLM_LATENCY_BUDGET, on_llm_queries=None):
+    """
+    Latency-budgeted build_search_queries.
+
+    Waits at most `budget` seconds for Ollama (None waits indefinitely, 0
+    returns templates instantly). If the LLM is late, template queries are
+    returned right away and the generation keeps running; when it finishes,
+    `on_llm_queries` is called with the LLM queries merged over the templates.
+
+    Returns:
+        (queries, source) where source is "llm", "fallback" or "pending_llm"
+    """
+    print("🔎 Building search queries...")
     
-    return fallback_queries
\ No newline at end of file
+    if country:
+        print(f"🌍 Target Country: {country}")
+    if locations:
+        print(f"📍 Using locations: {', '.join(locations[:3])}")
+
+    llm_task = asyncio.ensure_future(agenerate_queries_with_ollama(skills, locations, country, max_queries))
+    done, _ = await asyncio.wait({llm_task}, timeout=budget)
+
+    if llm_task in done:
+        ollama_queries = llm_task.result()
+        if ollama_queries and len(ollama_queries) >= 3:
+            print("✅ Using Ollama-generated queries")
+            return plan_queries(ollama_queries, skills, locations, country, budget=max_queries), "llm"
+
+        print("⚠️  Using fallback query generation...")
+        return build_planned_fallback_queries(skills, locations, country, max_queries), "fallback"
+
+    fallback_queries = build_planned_fallback_queries(skills, locations, country, max_queries)
+    print(f"⏱️  Ollama exceeded the {budget}s budget, returning template queries now")
+
+    def _on_done(task):
+        if task.cancelled() or task.exception() is not None:
+            return
+        ollama_queries = task.result()
+        if not ollama_queries or len(ollama_queries) < 3:
+            return
+        print(f"✅ Late Ollama queries arrived ({len(ollama_queries)}), merging into job")
+        if on_llm_queries:
+            merged = merge_queries(ollama_queries, fallback_queries, max_queries * QUERY_POOL_FACTOR)
+            on_llm_queries(plan_queries(merged, skills, locations, country, budget=max_queries))
+
+    llm_task.add_done_callback(_on_done)
+    return fallback_queries, "pending_llm"
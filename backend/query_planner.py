@@ -0,0 +1,108 @@
+from text_normalizer import normalize_skill
+
+
+STOPWORDS = {"a", "an", "the", "for", "in", "at", "to", "and", "of", "with", "on"}
+
+# Queries whose token sets overlap at least this much (Jaccard) are
+# considered the same search, e.g. "python developer hiring india" and
+# "hiring python developer india"
+SIMILARITY_THRESHOLD = 0.75
+
+# Greedy gain weights
+SKILL_WEIGHT = 2.0
+LOCATION_WEIGHT = 1.0
+NOVELTY_WEIGHT = 0.5
+
+
+def query_tokens(query: str) -> frozenset:
+    return frozenset(t for t in query.lower().split() if t not in STOPWORDS)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _mentions(query: str, term: str) -> bool:
+    return f" {term} " in f" {query} "
+
+
+def dedupe_queries(queries, threshold: float = SIMILARITY_THRESHOLD):
+    """
+    Clusters queries by token-set similarity and keeps the first query of
+    each cluster, preserving order.
+    """
+    kept = []
+    kept_tokens = []
+    for query in queries:
+        tokens = query_tokens(query)
+        if any(jaccard(tokens, other) >= threshold for other in kept_tokens):
+            continue
+        kept.append(query)
+        kept_tokens.append(tokens)
+    return kept
+
+
+def plan_queries(queries, skills, locations=None, country=None, budget: int = 12,
+                 threshold: float = SIMILARITY_THRESHOLD):
+    """
+    Picks at most `budget` queries that cover as many skills and locations
+    as possible with as little overlap as possible.
+
+    Near-duplicates are dropped first, then queries are chosen greedily by
+    the number of not-yet-covered skills/locations they mention plus the
+    share of tokens not used by any chosen query. Selection stops early when
+    no remaining query adds anything, so the result can be shorter than
+    the budget. Ties keep the original (LLM/template) order.
+    """
+    candidates = [q.strip().lower() for q in queries if q and q.strip()]
+    unique = dedupe_queries(candidates, threshold)
+
+    skill_terms = {normalize_skill(s) for s in skills if len(normalize_skill(s)) >= 2}
+    location_terms = {loc.lower().strip() for loc in (locations or [])}
+    if country:
+        location_terms.add(country.lower().strip())
+
+    info = []
+    for query in unique:
+        info.append((
+            query,
+            query_tokens(query),
+            {s for s in skill_terms if _mentions(query, s)},
+            {loc for loc in location_terms if _mentions(query, loc)},
+        ))
+
+    selected = []
+    covered_skills = set()
+    covered_locations = set()
+    used_tokens = set()
+
+    while info and len(selected) < budget:
+        best_idx = None
+        best_gain = 0.0
+
+        for idx, (query, tokens, q_skills, q_locations) in enumerate(info):
+            novelty = len(tokens - used_tokens) / len(tokens) if tokens else 0.0
+            gain = (
+                SKILL_WEIGHT * len(q_skills - covered_skills)
+                + LOCATION_WEIGHT * len(q_locations - covered_locations)
+                + NOVELTY_WEIGHT * novelty
+            )
+            if gain > best_gain:
+                best_idx, best_gain = idx, gain
+
+        if best_idx is None:
+            break
+
+        query, tokens, q_skills, q_locations = info.pop(best_idx)
+        selected.append(query)
+        covered_skills |= q_skills
+        covered_locations |= q_locations
+        used_tokens |= tokens
+
+    print(f"🧭 Query planner: {len(candidates)} candidates → {len(selected)} queries "
+          f"({len(candidates) - len(unique)} near-duplicates dropped, "
+          f"{len(covered_skills)}/{len(skill_terms)} skills covered)")
+
+    return selected
@@ -0,0 +1,156 @@
+import json
+import math
+import os
+import threading
+
+from shared_state import file_lock
+from text_normalizer import normalize_skill
+
+
+DEFAULT_LIMIT_PER_QUERY = 5
+MIN_LIMIT_PER_QUERY = 1
+MAX_LIMIT_PER_QUERY = 10
+
+# The scraper checks up to limit * MAX_CHECK_FACTOR posts per query
+MAX_CHECK_FACTOR = 3
+
+# Smoothing for templates with little history: behave as if every
+# template had already run PRIOR_RUNS times keeping PRIOR_KEPT_PER_RUN
+# posts out of PRIOR_FOUND_PER_RUN checked, taking PRIOR_SECONDS_PER_RUN
+PRIOR_RUNS = 2
+PRIOR_KEPT_PER_RUN = 3
+PRIOR_FOUND_PER_RUN = 8
+PRIOR_SECONDS_PER_RUN = 30
+
+YIELD_FILE = "cache/query_yield.json"
+
+
+def query_template(query: str, skills=None, locations=None, country=None) -> str:
+    """
+    Abstracts a query into its template by replacing the skill and location
+    words, e.g. "react developer hiring chennai" -> "{skill} developer hiring {location}".
+    """
+    text = f" {query.lower().strip()} "
+
+    terms = [(normalize_skill(s), "{skill}") for s in (skills or [])]
+    terms += [(s.lower(), "{skill}") for s in (skills or [])]
+    terms += [(loc.lower().strip(), "{location}") for loc in (locations or [])]
+    if country:
+        terms.append((country.lower().strip(), "{location}"))
+
+    # Longest first so "machine learning" wins over "learning"
+    for term, placeholder in sorted(terms, key=lambda t: -len(t[0])):
+        if len(term) >= 2:
+            text = text.replace(f" {term} ", f" {placeholder} ")
+
+    return " ".join(text.split())
+
+
+class QueryYieldStore:
+    """
+    Per-template scraping history (runs, posts found, posts kept, seconds)
+    persisted as one JSON file. Workers sharing the file re-read it when
+    another one has written it, and record under a file lock.
+    """
+
+    def __init__(self, path: str = YIELD_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.templates = {}
+        self._reload()
+
+    def _reload(self):
+        """
+        Re-reads the file if it changed since it was last read or written.
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.templates = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError):
+            pass
+
+    def record(self, samples):
+        """
+        Adds one run per (template, found, kept, seconds) sample. The
+        whole batch takes the file lock and rewrites the file once.
+        Blocking: call it from the threadpool.
+        """
+        if not samples:
+            return
+        with self._lock, file_lock(f"{self.path}.lock"):
+            self._reload()
+            for template, found, kept, seconds in samples:
+                entry = self.templates.setdefault(template, {"runs": 0, "found": 0, "kept": 0, "seconds": 0.0})
+                entry["runs"] += 1
+                entry["found"] += found
+                entry["kept"] += kept
+                entry["seconds"] += seconds
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.templates, f)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def estimate(self, template: str) -> dict:
+        """
+        Smoothed expectations for one run of the template.
+        """
+        entry = self.templates.get(template, {})
+        runs = entry.get("runs", 0) + PRIOR_RUNS
+        kept = entry.get("kept", 0) + PRIOR_RUNS * PRIOR_KEPT_PER_RUN
+        found = entry.get("found", 0) + PRIOR_RUNS * PRIOR_FOUND_PER_RUN
+        seconds = entry.get("seconds", 0.0) + PRIOR_RUNS * PRIOR_SECONDS_PER_RUN
+        return {
+            "kept_per_run": kept / runs,
+            "keep_ratio": kept / max(found, 1),
+            "kept_per_minute": kept / max(seconds, 1e-6) * 60,
+        }
+
+    def plan(self, queries, templates, limit_per_query: int = DEFAULT_LIMIT_PER_QUERY):
+        """
+        Spreads a total budget of limit_per_query * len(queries) posts over
+        the queries in proportion to their template's historical keep
+        ratio. Posts kept per run would not do: a run keeps at most the
+        limit it was given, so a template once given a small limit would
+        look low-yield and keep getting small limits.
+
+        Returns a list of {"query", "template", "limit", "max_checks"},
+        highest posts-per-minute first. Low keep ratios get fewer checks,
+        so queries that mostly return filtered posts stop early.
+        """
+        if not queries:
+            return []
+
+        with self._lock:
+            self._reload()
+        estimates = [self.estimate(t) for t in templates]
+        total_budget = limit_per_query * len(queries)
+        total_yield = sum(e["keep_ratio"] for e in estimates) or 1.0
+
+        plan = []
+        for query, template, estimate in zip(queries, templates, estimates):
+            share = total_budget * estimate["keep_ratio"] / total_yield
+            limit = max(MIN_LIMIT_PER_QUERY, min(MAX_LIMIT_PER_QUERY, round(share)))
+            checks = math.ceil(limit / max(estimate["keep_ratio"], 1 / MAX_CHECK_FACTOR))
+            plan.append({
+                "query": query,
+                "template": template,
+                "limit": limit,
+                "max_checks": min(checks, limit * MAX_CHECK_FACTOR),
+                "expected_kept_per_minute": round(estimate["kept_per_minute"], 2),
+            })
+
+        plan.sort(key=lambda p: p["expected_kept_per_minute"], reverse=True)
+        return plan
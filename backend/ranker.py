@@ -1,19 +1,199 @@
+import math
+import time
+
+import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from post_store import PostColumns
+
+
+# Score = text * cosine + the other weights * their signal (each in [0, 1]).
+# A job without skills or locations, or posts without a time, get 0 for
+# that signal, so the order falls back to text similarity
+DEFAULT_WEIGHTS = {"text": 1.0, "skills": 0.1, "location": 0.05, "freshness": 0.05}
+SKILL_SATURATION = 3  # resume skills a post must mention for the full skills signal
+COUNTRY_MATCH = 0.5  # a country mention counts half as much as a city/region
+FRESHNESS_HALF_LIFE_HOURS = 72
+
 
-def rank_posts(resume_text, posts, top_k=5):
+def parse_weights(spec=None) -> dict:
     """
-    Ranks LinkedIn posts based on similarity to resume text.
+    DEFAULT_WEIGHTS overridden by `spec`: a dict or a "name:value,..."
+    string such as "skills:0.2,freshness:0". Raises ValueError for
+    unknown names or values that are not finite and >= 0.
     """
+    weights = dict(DEFAULT_WEIGHTS)
+    if not spec:
+        return weights
+    if isinstance(spec, str):
+        items = []
+        for part in spec.split(","):
+            name, sep, value = part.partition(":")
+            if not sep:
+                raise ValueError(f"weight '{part.strip()}' must be name:value")
+            items.append((name.strip(), value.strip()))
+    elif isinstance(spec, dict):
+        items = spec.items()
+    else:
+        raise ValueError("weights must be an object or a name:value list")
 
-    documents = [resume_text] + [post["content"] for post in posts]
+    for name, value in items:
+        if name not in weights:
+            raise ValueError(f"unknown weight '{name}', expected one of {', '.join(DEFAULT_WEIGHTS)}")
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"weight '{name}' must be a number")
+        if not math.isfinite(value) or value < 0:
+            raise ValueError(f"weight '{name}' must be a finite number >= 0")
+        weights[name] = value
+    return weights
 
-    vectorizer = TfidfVectorizer(
+
+def _make_vectorizer():
+    return TfidfVectorizer(
         stop_words="english",
         ngram_range=(1, 2)
     )
 
+
+def _post_columns(posts):
+    """
+    (contents, authors, links, posted_at) of a PostColumns or a list of post dicts.
+    """
+    if isinstance(posts, PostColumns):
+        return posts.contents, posts.authors, posts.links, posts.posted_at
+    return (
+        [post["content"] for post in posts],
+        [post["author"] for post in posts],
+        [post.get("links", []) for post in posts],
+        [post.get("posted_at") for post in posts],
+    )
+
+
+def _phrase_columns(vectorizer, phrases):
+    """
+    Vocabulary columns each phrase needs: its single term, or every
+    bigram of a longer phrase, analyzed exactly like the posts were.
+    Phrases with a term outside the fitted vocabulary occur in no post and
+    are dropped, as are phrases with no term at all (e.g. "C", which
+    the two-character token pattern never sees).
+    """
+    analyze = vectorizer.build_analyzer()
+    vocabulary = vectorizer.vocabulary_
+    needed = {}
+    for phrase in phrases or ():
+        terms = analyze(str(phrase))
+        terms = [term for term in terms if " " in term] or terms
+        if terms and all(term in vocabulary for term in terms):
+            needed[tuple(sorted({vocabulary[term] for term in terms}))] = None
+    return list(needed)
+
+
+def _phrase_hits(post_vectors, phrase_columns):
+    """
+    How many of the phrases each post (row) contains, read off the
+    fitted TF-IDF matrix: a post contains a phrase when every column the
+    phrase needs is non-zero in its row.
+    """
+    if not phrase_columns:
+        return np.zeros(post_vectors.shape[0])
+
+    columns = sorted({column for needed in phrase_columns for column in needed})
+    position = {column: i for i, column in enumerate(columns)}
+    present = (post_vectors[:, columns] > 0).astype(np.float64)
+
+    # columns x phrases incidence: present @ required counts each phrase's terms found per post
+    rows = [position[column] for needed in phrase_columns for column in needed]
+    sizes = [len(needed) for needed in phrase_columns]
+    required = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, np.repeat(np.arange(len(phrase_columns)), sizes))),
+        shape=(len(columns), len(phrase_columns)),
+    )
+    found = (present @ required).toarray()
+    return (found == np.asarray(sizes)).sum(axis=1)
+
+
+def _signals(vectorizer, post_vectors, posted_at, context, now):
+    """
+    Per-post signals next to text similarity, as arrays over the rows of
+    `post_vectors`: matched resume skills, location match in [0, 1] and
+    freshness in [0, 1] (halving every FRESHNESS_HALF_LIFE_HOURS of age
+    at `now`).
+    """
+    context = context or {}
+    skills = _phrase_hits(post_vectors, _phrase_columns(vectorizer, context.get("skills")))
+    locations = _phrase_hits(post_vectors, _phrase_columns(vectorizer, context.get("locations")))
+    country = _phrase_hits(post_vectors, _phrase_columns(vectorizer, [context.get("country") or ""]))
+
+    # Unknown times (None) become NaN and then no boost; times past `now`
+    # (clock skew between scraper and server) count as just posted
+    ages = np.maximum(now - np.array(posted_at, dtype=np.float64), 0) / 3600
+    freshness = np.nan_to_num(0.5 ** (ages / FRESHNESS_HALF_LIFE_HOURS), nan=0.0)
+
+    return {
+        "skills": skills,
+        "location": np.minimum(1.0, locations + COUNTRY_MATCH * country),
+        "freshness": freshness,
+    }
+
+
+def _combine(similarities, signals, weights):
+    scores = weights["text"] * similarities
+    scores = scores + weights["skills"] * np.minimum(signals["skills"], SKILL_SATURATION) / SKILL_SATURATION
+    scores = scores + weights["location"] * signals["location"]
+    return scores + weights["freshness"] * signals["freshness"]
+
+
+def _top_results(scores, contents, authors, links, top_k, similarities=None, signals=None):
+    # Stable sort on the rounded score keeps the original tie order
+    rounded = np.round(scores, 3)
+    order = np.argsort(-rounded, kind="stable")[:top_k]
+
+    ranked_results = []
+
+    for idx in order:
+        result = {
+            "author": authors[idx],
+            "content": contents[idx],
+            "links": list(links[idx]),
+            "score": round(float(scores[idx]), 3)
+        }
+        if signals is not None:
+            result["signals"] = {
+                "text": round(float(similarities[idx]), 3),
+                "skills": int(signals["skills"][idx]),
+                "location": round(float(signals["location"][idx]), 3),
+                "freshness": round(float(signals["freshness"][idx]), 3),
+            }
+        ranked_results.append(result)
+
+    return ranked_results
+
+
+def rank_posts(resume_text, posts, top_k=5, skills=None, locations=None, country=None, weights=None, now=None):
+    """
+    Ranks LinkedIn posts based on similarity to resume text, boosted by
+    how many of the resume's `skills` a post mentions, whether it
+    mentions the resume's `locations` or `country`, and how recent it is
+    at `now` (Unix time, default the current time).
+
+    `posts` is a list of post dicts or a PostColumns; only the top_k
+    results are turned into dicts. `weights` is anything parse_weights
+    accepts. Each result carries its "signals" next to the final score.
+    """
+
+    weights = parse_weights(weights)
+    now = time.time() if now is None else now
+
+    contents, authors, links, posted_at = _post_columns(posts)
+
+    documents = [resume_text] + contents
+
+    vectorizer = _make_vectorizer()
+
     tfidf_matrix = vectorizer.fit_transform(documents)
 
     resume_vector = tfidf_matrix[0]
@@ -21,16 +201,88 @@ def rank_posts(resume_text, posts, top_k=5):
 
     similarities = cosine_similarity(resume_vector, post_vectors)[0]
 
-    ranked_results = []
+    context = {"skills": skills, "locations": locations, "country": country}
+    signals = _signals(vectorizer, post_vectors, posted_at, context, now)
+    scores = _combine(similarities, signals, weights)
+
+    return _top_results(scores, contents, authors, links, top_k, similarities, signals)
+
+
+def rank_many(jobs, top_k=5, pool=False, weights=None, now=None):
+    """
+    Ranks several jobs' posts in one pass. `jobs` is a list of
+    (resume_text, posts) pairs, or (resume_text, posts, context) triples
+    where context is a dict with the job's "skills", "locations" and
+    "country" (see rank_posts); returns one ranked list per job, in order.
+    Freshness is measured at `now`, as in rank_posts.
+
+    One vectorizer is fitted on every resume and every distinct post
+    (posts shared between jobs are vectorized once), so all jobs share
+    one vocabulary and IDF; scores therefore differ slightly from
+    rank_posts, whose IDF comes from a single job.
+
+    All cosines come from one sparse posts x resumes matrix product.
+    pool=False ranks each job's own posts: every post's score is read
+    from its job's column. pool=True ranks every job's resume against
+    the distinct posts of all jobs.
+    """
+    if not jobs:
+        return []
+
+    weights = parse_weights(weights)
+    now = time.time() if now is None else now
+    columns = [_post_columns(job[1]) for job in jobs]
+    contexts = [job[2] if len(job) > 2 else None for job in jobs]
+
+    # Rows: resumes first, then each distinct post content once
+    documents = [job[0] for job in jobs]
+    row_of = {}
+    post_rows = []
+    distinct_posts = []  # (author, links, posted_at) of each distinct post's first occurrence
+    for contents, authors, links, posted_at in columns:
+        rows = []
+        for i, content in enumerate(contents):
+            row = row_of.get(content)
+            if row is None:
+                row = row_of[content] = len(documents)
+                documents.append(content)
+                distinct_posts.append((authors[i], links[i], posted_at[i]))
+            rows.append(row)
+        post_rows.append(np.asarray(rows, dtype=np.intp))
+
+    # TfidfVectorizer rows are L2-normalised: cosine is the dot product.
+    # Kept sparse, since most post/resume pairs share no term
+    vectorizer = _make_vectorizer()
+    tfidf_matrix = vectorizer.fit_transform(documents).tocsr()
+    resume_vectors = tfidf_matrix[:len(jobs)]
+    post_vectors = tfidf_matrix[len(jobs):]
+    cosines = (post_vectors @ resume_vectors.T).tocsc()
 
-    for idx, score in enumerate(similarities):
-        ranked_results.append({
-            "author": posts[idx]["author"],
-            "content": posts[idx]["content"],
-            "links": posts[idx].get("links", []),
-            "score": round(float(score), 3)
-        })
+    if pool:
+        contents = documents[len(jobs):]
+        authors = [author for author, _, _ in distinct_posts]
+        links = [post_links for _, post_links, _ in distinct_posts]
+        posted_at = [post_time for _, _, post_time in distinct_posts]
+        ranked = []
+        for job, context in enumerate(contexts):
+            similarities = cosines[:, job].toarray().ravel()
+            signals = _signals(vectorizer, post_vectors, posted_at, context, now)
+            scores = _combine(similarities, signals, weights)
+            ranked.append(_top_results(scores, contents, authors, links, top_k, similarities, signals))
+        return ranked
 
-    ranked_results.sort(key=lambda x: x["score"], reverse=True)
+    # Each post's score sits in its own job's column
+    owners = np.repeat(np.arange(len(jobs)), [len(rows) for rows in post_rows])
+    post_index = np.concatenate(post_rows) - len(jobs)
+    all_similarities = np.asarray(cosines.tocsr()[post_index, owners]).ravel()
 
-    return ranked_results[:top_k]
+    ranked = []
+    start = 0
+    for (contents, authors, links, posted_at), rows, context in zip(columns, post_rows, contexts):
+        end = start + len(rows)
+        similarities = all_similarities[start:end]
+        signals = _signals(vectorizer, post_vectors[rows - len(jobs)], posted_at, context, now)
+        scores = _combine(similarities, signals, weights)
+        ranked.append(_top_results(scores, contents, authors, links, top_k, similarities, signals))
+        start = end
+    return ranked
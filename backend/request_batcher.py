@@ -0,0 +1,92 @@
+import asyncio
+import functools
+
+
+# Requests arriving within BATCH_WINDOW seconds of each other are flushed
+# together; a batch is flushed early once it holds BATCH_MAX_SIZE requests
+BATCH_WINDOW = 0.05
+BATCH_MAX_SIZE = 16
+
+
+class RequestBatcher:
+    """
+    Micro-batching scheduler for slow, blocking backend calls.
+
+    Callers `await submit(key, *args)`. Requests are collected for a short
+    window, identical keys (in the same batch or already in flight) share a
+    single call, and the distinct calls of a batch run concurrently on the
+    default executor with at most `max_parallel` in flight. Each caller gets
+    the result (or exception) of the call for its key.
+    """
+
+    def __init__(self, worker, max_parallel: int = 4, window: float = BATCH_WINDOW, max_batch: int = BATCH_MAX_SIZE):
+        self.worker = worker
+        self.max_parallel = max_parallel
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = {"requests": 0, "batches": 0, "dispatched": 0, "shared": 0}
+
+        self._pending = {}   # key -> (args, [futures]) waiting for the window
+        self._inflight = {}  # key -> [futures] whose call is already running
+        self._flush_handle = None
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    async def submit(self, key, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.stats["requests"] += 1
+
+        if key in self._inflight:
+            self._inflight[key].append(future)
+            self.stats["shared"] += 1
+        elif key in self._pending:
+            self._pending[key][1].append(future)
+            self.stats["shared"] += 1
+        else:
+            self._pending[key] = (args, [future])
+
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        self.stats["batches"] += 1
+        for key, (args, futures) in batch.items():
+            self._inflight[key] = futures
+            asyncio.ensure_future(self._dispatch(key, args))
+
+    async def _dispatch(self, key, args):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_parallel)
+            self._semaphore_loop = loop
+
+        result = None
+        error = None
+
+        async with self._semaphore:
+            self.stats["dispatched"] += 1
+            try:
+                result = await loop.run_in_executor(None, functools.partial(self.worker, *args))
+            except Exception as e:
+                error = e
+
+        for future in self._inflight.pop(key, []):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
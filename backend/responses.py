@@ -0,0 +1,278 @@
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Responses smaller than this are sent uncompressed; headers and CPU would
+# eat the saving
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4  # fast setting suited to dynamic responses
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+PAYLOAD_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# orjson when available: several times faster than the stdlib encoder and
+# emits bytes directly. Same JSON either way.
+APIResponse = ORJSONResponse if orjson else JSONResponse
+
+
+def dumps(content) -> bytes:
+    if orjson:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return JSONResponse(content).body
+
+
+def negotiate_encoding(accept_encoding: str):
+    """
+    Picks "br" or "gzip" from an Accept-Encoding header (brotli only if
+    installed), or None for identity.
+    """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+
+    if brotli and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _streaming_compressor(encoding: str):
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    return compressor.compress, compressor.flush
+
+
+def _vary_on_encoding(headers):
+    """
+    Adds `Vary: Accept-Encoding` to raw ASGI headers unless a Vary header
+    already covers it.
+    """
+    for name, value in headers:
+        if name.lower() == b"vary" and (b"accept-encoding" in value.lower() or value.strip() == b"*"):
+            return headers
+    return [*headers, (b"vary", b"Accept-Encoding")]
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing compressible responses of at least
+    `minimum_size` bytes with brotli or gzip, per Accept-Encoding.
+    Streaming responses are compressed chunk by chunk; responses that
+    already carry a Content-Encoding pass through untouched.
+
+    Every compressible response gets `Vary: Accept-Encoding`, including
+    those sent uncompressed (too small, or no supported encoding asked
+    for), so shared caches never hand one client's variant to another.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+
+        state = {"start": None, "mode": None, "compress": None, "flush": None}
+
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                response_headers = {k.lower(): v for k, v in message["headers"]}
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                # A 304 carries no body or type but must repeat the Vary of the full response
+                varies = content_type.startswith(COMPRESSIBLE_TYPES) or message["status"] == 304
+                if b"content-encoding" in response_headers or not varies:
+                    state["mode"] = "passthrough"
+                    await send(message)
+                    return
+
+                message = {**message, "headers": _vary_on_encoding(message["headers"])}
+                if encoding is None or message["status"] == 304:
+                    state["mode"] = "passthrough"
+                    await send(message)
+                    return
+
+                # Held back until the first body chunk decides the mode
+                state["start"] = message
+                return
+
+            if message["type"] != "http.response.body" or state["mode"] == "passthrough":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if state["mode"] is None:
+                start = state["start"]
+                if not more_body and len(body) < self.minimum_size:
+                    state["mode"] = "passthrough"
+                    await send(start)
+                    await send(message)
+                    return
+
+                # ETags stay as they are: ours are weak, and weak validators
+                # may be shared by compressed and identity representations
+                new_headers = [(k, v) for k, v in start["headers"] if k.lower() != b"content-length"]
+                new_headers.append((b"content-encoding", encoding.encode("latin-1")))
+
+                if not more_body:
+                    compressed = compress(body, encoding)
+                    new_headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+                    state["mode"] = "done"
+                    await send({**start, "headers": new_headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+                state["mode"] = "stream"
+                state["compress"], state["flush"] = _streaming_compressor(encoding)
+                await send({**start, "headers": new_headers})
+
+            chunk = state["compress"](body)
+            if not more_body:
+                chunk += state["flush"]()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class PayloadCache:
+    """
+    Serialized (and lazily compressed) response bodies for payloads that
+    can no longer change, e.g. completed jobs. Keys must include the data
+    version and every view parameter. LRU, bounded by total bytes.
+    """
+
+    def __init__(self, max_bytes: int = PAYLOAD_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> {encoding or "identity": bytes}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def response(self, key, build, accept_encoding: str = None, headers=None) -> Response:
+        """
+        Returns the cached body for `key` in the best accepted encoding,
+        calling `build()` for the payload on a miss.
+        """
+        encoding = negotiate_encoding(accept_encoding)
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if variants is None:
+            variants = {"identity": dumps(build())}
+            self._store(key, variants)
+
+        body = variants["identity"]
+        response_headers = dict(headers or {})
+        # Set on identity bodies too: the same URL may be served compressed
+        response_headers["Vary"] = "Accept-Encoding"
+        if encoding and len(body) >= COMPRESS_MIN_BYTES:
+            if encoding not in variants:
+                variants[encoding] = compress(body, encoding)
+                self._grow(key, len(variants[encoding]))
+            body = variants[encoding]
+            response_headers["Content-Encoding"] = encoding
+
+        return Response(content=body, media_type="application/json", headers=response_headers)
+
+    async def aresponse(self, key, build, accept_encoding: str = None, headers=None) -> Response:
+        """
+        response() for async handlers: a body already cached in the wanted
+        encoding is returned inline; building, serializing or compressing
+        one runs in the threadpool.
+        """
+        encoding = negotiate_encoding(accept_encoding)
+        with self._lock:
+            variants = self._entries.get(key)
+        if variants is not None and (
+            not encoding or encoding in variants or len(variants["identity"]) < COMPRESS_MIN_BYTES
+        ):
+            return self.response(key, build, accept_encoding, headers)
+        return await run_in_threadpool(self.response, key, build, accept_encoding, headers)
+
+    def _store(self, key, variants):
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = variants
+                self._bytes += len(variants["identity"])
+            self._evict()
+
+    def _grow(self, key, size: int):
+        with self._lock:
+            if key in self._entries:
+                self._bytes += size
+                self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, variants = self._entries.popitem(last=False)
+            self._bytes -= sum(len(v) for v in variants.values())
+
+    def discard(self, job_id: str, before_version: int = None):
+        """
+        Drops every entry whose key starts with `job_id` (only those built
+        for a version older than `before_version`, when given).
+        """
+        with self._lock:
+            stale = [
+                k for k in self._entries
+                if k[0] == job_id and (before_version is None or k[1] < before_version)
+            ]
+            for key in stale:
+                self._bytes -= sum(len(v) for v in self._entries.pop(key).values())
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,193 @@
+from post_store import Post, PostColumns
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+FORMATS = ("arrow", "parquet")
+
+# Rows per Parquet row group / Arrow batch when a job is very large
+MAX_BATCH_ROWS = 64 * 1024
+COMPRESSION = "zstd"  # Parquet column chunks and Arrow IPC buffers
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Columnar export needs pyarrow: pip install pyarrow")
+
+
+def archive_schema():
+    require_pyarrow()
+    return pa.schema([
+        ("job_id", pa.string()),
+        ("query", pa.string()),
+        ("author", pa.string()),
+        ("content", pa.string()),
+        ("post_url", pa.string()),
+        ("links", pa.list_(pa.string())),
+        ("posted_at", pa.float64()),
+    ])
+
+
+def job_batches(job_id: str, columns: PostColumns):
+    """
+    Record batches for one job's posts, straight from the columns.
+    """
+    schema = archive_schema()
+    for start in range(0, len(columns), MAX_BATCH_ROWS):
+        end = min(start + MAX_BATCH_ROWS, len(columns))
+        rows = end - start
+        yield pa.record_batch([
+            pa.array([job_id] * rows, pa.string()),
+            pa.array(columns.queries[start:end], pa.string()),
+            pa.array(columns.authors[start:end], pa.string()),
+            pa.array(columns.contents[start:end], pa.string()),
+            pa.array(columns.post_urls[start:end], pa.string()),
+            pa.array([list(links) for links in columns.links[start:end]], pa.list_(pa.string())),
+            pa.array(columns.posted_at[start:end], pa.float64()),
+        ], schema=schema)
+
+
+class _ChunkSink:
+    """
+    Write-only file object collecting what pyarrow writes, so a writer's
+    output can be handed out chunk by chunk.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _ipc_options():
+    return pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+
+
+def _open_writer(sink, fmt: str):
+    if fmt == "parquet":
+        return pq.ParquetWriter(sink, archive_schema(), compression=COMPRESSION)
+    return pa.ipc.new_stream(sink, archive_schema(), options=_ipc_options())
+
+
+def _write_batch(writer, batch, fmt: str):
+    if fmt == "parquet":
+        writer.write_table(pa.Table.from_batches([batch]))
+    else:
+        writer.write_batch(batch)
+
+
+def stream_archive(jobs, fmt: str = "arrow"):
+    """
+    Yields the archive of `jobs` ((job_id, PostColumns) pairs) as bytes,
+    one chunk per batch, for a streaming HTTP response. Arrow output is
+    the IPC stream format; Parquet gets one row group per batch.
+    """
+    require_pyarrow()
+    raw_sink = _ChunkSink()
+    sink = pa.PythonFile(raw_sink, mode="w")
+    writer = _open_writer(sink, fmt)
+
+    for job_id, columns in jobs:
+        for batch in job_batches(job_id, columns):
+            _write_batch(writer, batch, fmt)
+            chunk = raw_sink.drain()
+            if chunk:
+                yield chunk
+
+    writer.close()
+    yield raw_sink.drain()
+
+
+def write_archive(path: str, jobs, fmt: str = "arrow") -> int:
+    """
+    Writes `jobs` to `path`. Arrow uses the IPC file format (random
+    access, memory-mappable). Returns the number of posts written.
+    """
+    require_pyarrow()
+    rows = 0
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(path, archive_schema(), compression=COMPRESSION)
+    else:
+        writer = pa.ipc.new_file(path, archive_schema(), options=_ipc_options())
+
+    with writer:
+        for job_id, columns in jobs:
+            for batch in job_batches(job_id, columns):
+                _write_batch(writer, batch, fmt)
+                rows += batch.num_rows
+    return rows
+
+
+def read_table(path: str):
+    """
+    Memory-maps an archive (Arrow IPC file or stream, or Parquet) and
+    returns it as a pyarrow Table without copying the column data.
+    """
+    require_pyarrow()
+    if path.endswith(".parquet"):
+        return pq.read_table(path, memory_map=True)
+
+    source = pa.memory_map(path, "r")
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        # Stream format, as produced by the export endpoint
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+
+
+def _iter_rows(table):
+    """
+    Yields (job_id, Post) per row. Columns are converted to Python one
+    batch at a time, so only the posts being built and one batch are
+    held as Python objects; the rest stays in the mapped table.
+    """
+    for batch in table.to_batches(max_chunksize=MAX_BATCH_ROWS):
+        columns = {name: batch.column(i).to_pylist() for i, name in enumerate(batch.schema.names)}
+        for i, job_id in enumerate(columns["job_id"]):
+            yield job_id, Post(
+                columns["query"][i] or "",
+                columns["author"][i] or "",
+                columns["content"][i] or "",
+                columns["post_url"][i] or "",
+                tuple(columns["links"][i] or ()),
+                columns["posted_at"][i],
+            )
+
+
+def load_posts(path: str) -> PostColumns:
+    """
+    Reads every post in an archive into a single PostColumns, e.g. to
+    re-rank the full history.
+    """
+    posts = PostColumns()
+    for _, post in _iter_rows(read_table(path)):
+        posts.append(post)
+    return posts
@@ -1,73 +1,281 @@
 import pdfplumber
-import re
+import io
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 
+from text_normalizer import iter_clean_pages
 
-def clean_resume_text(text: str) -> str:
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+
+# Early termination: a resume never needs more than this for skill extraction
+MAX_PAGES = 30
+MAX_CHARS = 50000
+
+# Documents with at least this many pages are split across a process pool
+PARALLEL_PAGE_THRESHOLD = 20
+PAGES_PER_CHUNK = 5
+PDF_WORKERS = min(4, os.cpu_count() or 1)
+
+# The fast path must yield at least this much text per page, otherwise
+# the next backend (full pdfplumber layout analysis) is tried
+FAST_PATH_MIN_CHARS_PER_PAGE = 100
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """
+    Created on first use, which is usually a threadpool thread of the API
+    server: workers are spawned, not forked, so they never inherit a copy
+    of a multi-threaded process.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _open_pdfplumber(pdf_path):
+    """
+    pdf_path may be a filesystem path or the PDF's raw bytes.
+    """
+    if isinstance(pdf_path, (bytes, bytearray)):
+        return pdfplumber.open(io.BytesIO(pdf_path))
+    return pdfplumber.open(pdf_path)
+
+
+def _iter_raw_pages(pages, first_page_num: int = 0):
+    """
+    Yields raw text of each page that has any, skipping unreadable pages.
+    Page caches are released as soon as the text is taken.
+    """
+    for page_num, page in enumerate(pages, first_page_num):
+        try:
+            page_text = page.extract_text()
+            if page_text:
+                yield page_text
+        except Exception as e:
+            print(f"Warning: Could not extract text from page {page_num + 1}: {e}")
+            continue
+        finally:
+            page.flush_cache()
+
+
+def _extract_page_range(pdf_path, start: int, stop: int):
+    """
+    Worker for the process pool: opens the PDF independently and returns
+    the raw text of pages [start, stop).
     """
-    Cleans resume text for NLP usage.
-    Removes emails, phone numbers, links, and extra spaces.
+    with _open_pdfplumber(pdf_path) as pdf:
+        pages = pdf.pages[start:stop]
+        return list(_iter_raw_pages(pages, start))
+
+
+def _iter_pages_parallel(pdf_path, page_count: int):
+    chunks = [
+        (start, min(start + PAGES_PER_CHUNK, page_count))
+        for start in range(0, page_count, PAGES_PER_CHUNK)
+    ]
+    pool = _get_pool()
+    futures = [pool.submit(_extract_page_range, pdf_path, start, stop) for start, stop in chunks]
+
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        # Consumer stopped early (cutoff reached) - drop chunks not started yet
+        for future in futures:
+            future.cancel()
+
+
+def _pdfplumber_pages(pdf_path, max_pages: int = MAX_PAGES, parallel: bool = True, document: dict = None):
     """
-    if not text:
-        return ""
+    Full layout-analysis backend. Slow but handles unusual layouts.
+    """
+    with _open_pdfplumber(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+        if page_count == 0:
+            raise ValueError("PDF has no pages")
+
+        if max_pages:
+            page_count = min(page_count, max_pages)
+        if document is not None:
+            document["page_count"] = page_count
+
+        if parallel and page_count >= PARALLEL_PAGE_THRESHOLD and PDF_WORKERS > 1:
+            yield from _iter_pages_parallel(pdf_path, page_count)
+        else:
+            yield from _iter_raw_pages(pdf.pages[:page_count])
+
+
+def _pypdfium2_pages(pdf_path, max_pages: int = MAX_PAGES, document: dict = None):
+    """
+    Text-only backend using PDFium's text stream, no layout analysis.
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        page_count = len(pdf)
+        if page_count == 0:
+            raise ValueError("PDF has no pages")
+
+        if max_pages:
+            page_count = min(page_count, max_pages)
+        if document is not None:
+            document["page_count"] = page_count
+
+        for page_num in range(page_count):
+            page = pdf[page_num]
+            try:
+                textpage = page.get_textpage()
+                page_text = textpage.get_text_range()
+                textpage.close()
+                if page_text:
+                    yield page_text
+            except Exception as e:
+                print(f"Warning: Could not extract text from page {page_num + 1}: {e}")
+                continue
+            finally:
+                page.close()
+    finally:
+        pdf.close()
+
+
+# Tried in order; a backend whose module is missing is skipped. Each
+# records the number of pages it reads in the optional `document` dict
+PDF_BACKENDS = {
+    "pypdfium2": _pypdfium2_pages,
+    "pdfplumber": _pdfplumber_pages,
+}
+
+
+def _backend_available(name: str) -> bool:
+    if name == "pypdfium2":
+        return pdfium is not None
+    return True
+
+
+def _limit_chars(pages, max_chars: int):
+    """
+    Passes pages through until `max_chars` (counting the joining spaces)
+    is reached, truncating the last page.
+    """
+    if not max_chars:
+        yield from pages
+        return
+
+    remaining = max_chars
+    for page_text in pages:
+        if remaining <= 0:
+            return
+        if len(page_text) >= remaining:
+            yield page_text[:remaining]
+            return
+        remaining -= len(page_text) + 1
+        yield page_text
+
+
+def _enough_text(text: str, page_count: int, max_chars: int) -> bool:
+    if max_chars and len(text) >= max_chars:
+        return True
+    return len(text) >= FAST_PATH_MIN_CHARS_PER_PAGE * max(page_count, 1)
+
+
+def extract_text_and_metadata(pdf_path, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS) -> dict:
+    """
+    Extracts text from a PDF, trying the fast backend first and falling back
+    to pdfplumber when it yields too little text.
+
+    pdf_path may also be the PDF's raw bytes, so small uploads can be
+    processed without touching disk.
+
+    Returns:
+        dict with 'text' (cleaned), 'raw_text', 'backend', 'pages',
+        'elapsed_ms' and 'attempts' (per-backend timings)
+    """
+    if isinstance(pdf_path, (bytes, bytearray)):
+        label = f"<{len(pdf_path)} bytes in memory>"
+    else:
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        
+        if not pdf_path.lower().endswith('.pdf'):
+            raise ValueError("File must be a PDF")
+
+        label = os.path.basename(pdf_path)
     
-    text = text.lower()
+    backends = [name for name in PDF_BACKENDS if _backend_available(name)]
+    attempts = []
+    result = None
+
+    for idx, backend in enumerate(backends):
+        is_last = idx == len(backends) - 1
+        raw_pages = []
+        document = {}
+
+        def _record(pages):
+            for page_text in pages:
+                raw_pages.append(page_text)
+                yield page_text
+
+        start = time.perf_counter()
+        try:
+            pages = PDF_BACKENDS[backend](pdf_path, max_pages=max_pages, document=document)
+            text = " ".join(_limit_chars(iter_clean_pages(_record(pages)), max_chars))
+        except Exception as e:
+            if is_last and result is None:
+                if isinstance(e, (FileNotFoundError, ValueError)):
+                    raise
+                raise ValueError(f"Error reading PDF: {str(e)}")
+            print(f"⚠️  {backend} failed on {label}: {e}")
+            continue
+        elapsed_ms = (time.perf_counter() - start) * 1000
 
-    # Remove emails
-    text = re.sub(r"\S+@\S+", " ", text)
-   
-    # Remove phone numbers
-    text = re.sub(r"\+?\d[\d\s\-\(\)]{8,}\d", " ", text)
+        attempts.append({"backend": backend, "chars": len(text), "elapsed_ms": round(elapsed_ms, 1)})
+        print(f"📄 {backend}: {len(text)} chars from {len(raw_pages)} pages "
+              f"in {elapsed_ms:.0f} ms ({label})")
 
-    # Remove URLs
-    text = re.sub(r"http\S+|www\.\S+", " ", text)
+        result = {
+            "text": text,
+            "raw_text": "\n".join(raw_pages),
+            "backend": backend,
+            "pages": len(raw_pages),
+            "elapsed_ms": round(sum(a["elapsed_ms"] for a in attempts), 1),
+            "attempts": attempts,
+        }
 
-    # Remove extra whitespace
-    text = re.sub(r"\s+", " ", text)
+        # Judge by every page read, not only those that produced text: a
+        # scanned PDF with one text page must still fall back
+        if is_last or _enough_text(text, document.get("page_count", len(raw_pages)), max_chars):
+            break
+        print(f"⚠️  {backend} returned too little text, falling back to next backend...")
 
-    return text.strip()
+    return result
 
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+def extract_text_from_pdf(pdf_path, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS) -> str:
     """
     Extracts and cleans text from a PDF resume.
     """
-    if not os.path.exists(pdf_path):
-        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+    cleaned = extract_text_and_metadata(pdf_path, max_pages=max_pages, max_chars=max_chars)["text"]
+
+    if not cleaned:
+        raise ValueError("No text could be extracted from PDF. It might be an image-based PDF.")
     
-    if not pdf_path.lower().endswith('.pdf'):
-        raise ValueError("File must be a PDF")
+    if len(cleaned) < 50:
+        raise ValueError("Extracted text is too short. Please ensure your PDF contains actual text content.")
     
-    full_text = ""
-
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if len(pdf.pages) == 0:
-                raise ValueError("PDF has no pages")
-            
-            for page_num, page in enumerate(pdf.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        full_text += page_text + "\n"
-                except Exception as e:
-                    print(f"Warning: Could not extract text from page {page_num + 1}: {e}")
-                    continue
-
-        if not full_text.strip():
-            raise ValueError("No text could be extracted from PDF. It might be an image-based PDF.")
-        
-        cleaned = clean_resume_text(full_text)
-        
-        if len(cleaned) < 50:
-            raise ValueError("Extracted text is too short. Please ensure your PDF contains actual text content.")
-        
-        return cleaned
-        
-    except Exception as e:
-        if isinstance(e, (FileNotFoundError, ValueError)):
-            raise
-        raise ValueError(f"Error reading PDF: {str(e)}")
+    return cleaned
 
 
 if __name__ == "__main__":
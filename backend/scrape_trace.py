@@ -0,0 +1,226 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+TRACE_FILE = "scrape_traces.jsonl"
+
+# Once a trace file reaches TRACE_MAX_BYTES it is renamed to <file>.1
+# (older ones shift up to <file>.TRACE_BACKUPS, the oldest is dropped)
+TRACE_MAX_BYTES = 20 * 1024 * 1024
+TRACE_BACKUPS = 3
+
+# Post outcomes recorded per examined post
+KEPT = "kept"
+FILTERED = "filtered"          # not job-related
+NO_CONTENT = "no_content"      # no content selector produced > 20 chars
+ERROR = "error"
+
+
+class QueryTrace:
+    """
+    Structured record of one scraped query: where the time went
+    (navigation, waits, scrolling, per-post extraction), which selector
+    fallbacks matched and why posts were rejected.
+
+    `record` is a plain dict so it can be written as a JSON line and
+    uploaded with the results. Its top-level counters (available, checked,
+    kept, filtered, seconds) double as the query's yield stats.
+    """
+
+    def __init__(self, query: str, time_filter: str = None):
+        self._started = time.perf_counter()
+        self.record = {
+            "query": query,
+            "time_filter": time_filter,
+            "started_at": round(time.time(), 3),
+            "available": 0,
+            "checked": 0,
+            "kept": 0,
+            "filtered": 0,
+            "seconds": 0.0,
+            "post_selector": None,
+            "navigation_retried": False,
+            "timings": {},
+            "posts": [],
+            "error": None,
+        }
+
+    def add_time(self, name: str, seconds: float):
+        timings = self.record["timings"]
+        timings[name] = round(timings.get(name, 0.0) + seconds, 4)
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Adds the time spent inside the block to timings[name].
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def sleep(self, name: str, seconds: float):
+        with self.span(name):
+            time.sleep(seconds)
+
+    def add_post(self, index: int, outcome: str, seconds: float, content_selector=None,
+                 author_selector=None, has_url: bool = None, error: str = None):
+        post = {
+            "index": index,
+            "outcome": outcome,
+            "seconds": round(seconds, 4),
+            "content_selector": content_selector,
+            "author_selector": author_selector,
+        }
+        if has_url is not None:
+            post["has_url"] = has_url
+        if error:
+            post["error"] = error[:200]
+        self.record["posts"].append(post)
+
+    def finish(self) -> dict:
+        self.record["seconds"] = round(time.perf_counter() - self._started, 2)
+        return self.record
+
+
+def rotated_paths(path: str):
+    """
+    The trace file and its rotated backups, newest first.
+    """
+    return [path] + [f"{path}.{i}" for i in range(1, TRACE_BACKUPS + 1)]
+
+
+def _rotate(path: str):
+    try:
+        if os.path.getsize(path) < TRACE_MAX_BYTES:
+            return
+    except OSError:
+        return
+
+    paths = rotated_paths(path)
+    try:
+        for older, newer in zip(reversed(paths[1:]), reversed(paths[:-1])):
+            if os.path.exists(newer):
+                os.replace(newer, older)
+    except OSError:
+        # Another worker rotated it at the same moment
+        pass
+
+
+def write_traces(traces, path: str = TRACE_FILE, **extra):
+    """
+    Appends trace records to a JSON lines file, rotating it first once
+    it has grown past TRACE_MAX_BYTES. `extra` fields (e.g. job_id) are
+    added to every line.
+    """
+    if not traces:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    _rotate(path)
+    with open(path, "a", encoding="utf-8") as f:
+        for trace in traces:
+            f.write(json.dumps({**extra, **trace}) + "\n")
+
+
+def read_traces(paths):
+    """
+    Yields trace records from one or more JSON lines files, skipping
+    lines that do not parse.
+    """
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def _bump(table: dict, key, seconds: float = 0.0):
+    entry = table.setdefault(key, {"count": 0, "seconds": 0.0})
+    entry["count"] += 1
+    entry["seconds"] += seconds
+
+
+def summarize(traces) -> dict:
+    """
+    Aggregates trace records: total time per phase, post selector hits,
+    content/author selector fallbacks with their extraction time, and
+    post outcomes.
+    """
+    summary = {
+        "queries": 0,
+        "seconds": 0.0,
+        "available": 0,
+        "checked": 0,
+        "kept": 0,
+        "filtered": 0,
+        "navigation_retries": 0,
+        "errors": 0,
+        "timings": {},
+        "post_selectors": {},
+        "content_selectors": {},
+        "author_selectors": {},
+        "outcomes": {},
+    }
+
+    for trace in traces:
+        summary["queries"] += 1
+        summary["seconds"] += trace.get("seconds", 0.0)
+        for key in ("available", "checked", "kept", "filtered"):
+            summary[key] += trace.get(key, 0)
+        summary["navigation_retries"] += bool(trace.get("navigation_retried"))
+        summary["errors"] += bool(trace.get("error"))
+
+        for name, seconds in trace.get("timings", {}).items():
+            summary["timings"][name] = summary["timings"].get(name, 0.0) + seconds
+
+        _bump(summary["post_selectors"], trace.get("post_selector") or "(none)", trace.get("seconds", 0.0))
+
+        for post in trace.get("posts", []):
+            seconds = post.get("seconds", 0.0)
+            _bump(summary["outcomes"], post.get("outcome", "unknown"), seconds)
+            if post.get("content_selector"):
+                _bump(summary["content_selectors"], post["content_selector"], seconds)
+            if post.get("author_selector"):
+                _bump(summary["author_selectors"], post["author_selector"], seconds)
+
+    return summary
+
+
+def print_report(summary: dict):
+    # Shares are of traced time, which also includes waits between queries
+    total = sum(summary["timings"].values()) or 1e-9
+    sleeping = sum(v for k, v in summary["timings"].items() if k.endswith("_wait"))
+
+    print("\n📊 Scrape trace report")
+    print("=" * 60)
+    print(f"  Queries: {summary['queries']}  |  total {summary['seconds']:.1f}s  |  "
+          f"{summary['kept']}/{summary['checked']} posts kept ({summary['filtered']} filtered)")
+    print(f"  Navigation retries: {summary['navigation_retries']}  |  Failed queries: {summary['errors']}")
+
+    print(f"  Fixed sleeps: {sleeping:.1f}s ({sleeping / total * 100:.1f}% of traced time)")
+
+    print("\n⏱️  Time by phase:")
+    for name, seconds in sorted(summary["timings"].items(), key=lambda t: -t[1]):
+        print(f"  {name:22} {seconds:8.1f}s  {seconds / total * 100:5.1f}%")
+
+    sections = (
+        ("🔎 Post selectors (per query, avg query time):", "post_selectors"),
+        ("📝 Content selectors (per post, avg extraction time):", "content_selectors"),
+        ("👤 Author selectors (per post):", "author_selectors"),
+        ("🚦 Post outcomes:", "outcomes"),
+    )
+    for title, key in sections:
+        print(f"\n{title}")
+        for name, entry in sorted(summary[key].items(), key=lambda t: -t[1]["count"]):
+            avg = entry["seconds"] / entry["count"] if entry["count"] else 0.0
+            print(f"  {entry['count']:6}  avg {avg:6.2f}s  {name}")
+
+    print("=" * 60 + "\n")
@@ -0,0 +1,479 @@
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import chain
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# One database shared by every uvicorn worker on the machine
+SHARED_STATE_DB = os.environ.get("SHARED_STATE_DB", os.path.join("cache", "shared_state.db"))
+
+# Seconds a worker waits for another worker's write transaction
+BUSY_TIMEOUT = 30
+
+# Decoded job metadata each worker keeps in memory, most recently read last
+LOCAL_JOBS_MAX = 4096
+
+# Estimated in-memory bytes (see decoded_size) of heavy job fields
+# (results, resume text, traces) each worker keeps decoded; least
+# recently used payloads beyond it are dropped from memory and reloaded
+# from the database on the next access
+PAYLOAD_BUDGET_BYTES = 256 * 1024 * 1024
+PAYLOAD_FIELDS = ("results", "resume_text", "traces")
+
+# Pub/sub events older than this are pruned
+EVENT_RETENTION_SECONDS = 600
+EVENT_PRUNE_EVERY = 200
+
+JOBS_CHANNEL = "jobs"
+
+# Recorded as the database's user_version, so a later change to the
+# jobs table layout can tell which layout a file has
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    created_version INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    data BLOB NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_version);
+CREATE INDEX IF NOT EXISTS jobs_expiry ON jobs (status, updated_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters VALUES ('data_version', 0);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+# Leaf types decoded_size() does not look into
+_SCALARS = (str, bytes, int, float, bool, type(None))
+_SEQUENCES = (list, tuple, set, frozenset)
+
+
+def decoded_size(value) -> int:
+    """
+    Estimated memory held by a decoded value: sys.getsizeof over it and
+    everything it references through dicts, lists, tuples, sets and
+    __slots__ objects (e.g. PostColumns). Objects shared within the value,
+    such as interned queries and authors, are counted once.
+    """
+    seen = {id(value)}
+    total = sys.getsizeof(value)
+    level = [value]
+    # One level of references at a time: results hold tens of thousands
+    # of strings and tuples, which are deduped and sized in bulk
+    while level:
+        sequences = [obj for obj in level if isinstance(obj, _SEQUENCES)]
+        dicts = [obj for obj in level if isinstance(obj, dict)]
+        slotted = [getattr(obj, slot) for obj in level if not isinstance(obj, (dict, *_SEQUENCES))
+                   for slot in getattr(type(obj), "__slots__", ()) if hasattr(obj, slot)]
+        children = [*chain.from_iterable(sequences), *chain.from_iterable(dicts),
+                    *chain.from_iterable(map(dict.values, dicts)), *slotted]
+        unique = dict(zip(map(id, children), children))
+        new = list(map(unique.__getitem__, unique.keys() - seen))
+        seen.update(unique.keys())
+        total += sum(map(sys.getsizeof, new))
+        level = [obj for obj in new if type(obj) not in _SCALARS]
+    return total
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Exclusive advisory lock on `path` across processes (no-op where
+    fcntl is unavailable, i.e. single-worker Windows setups).
+    """
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class SharedJobStore:
+    """
+    Job state shared by all workers through one SQLite database in WAL
+    mode, so readers never wait for a writer.
+
+    Each job is stored as two pickled blobs: its metadata (status,
+    skills, queries, versions, result_count...) and its payload, the
+    PAYLOAD_FIELDS that make up nearly all of its size. Workers keep
+    metadata decoded and reload it only when the version changed;
+    payloads are decoded on demand into an LRU bounded by
+    `payload_budget` bytes, so completed jobs nobody reads no longer
+    hold memory.
+
+    Every mutation goes through create() / update() / expire(), which
+    take the next global data version in the same transaction and
+    publish it on the "jobs" channel for the other workers.
+    """
+
+    def __init__(self, path: str = SHARED_STATE_DB, local_max: int = LOCAL_JOBS_MAX,
+                 payload_budget: int = PAYLOAD_BUDGET_BYTES):
+        self.path = path
+        self.local_max = local_max
+        self.payload_budget = payload_budget
+        self._local = OrderedDict()  # job_id -> (job, size), oldest read first
+        self._local_bytes = 0
+        self._payloads = OrderedDict()  # job_id -> (payload_version, payload, size)
+        self._payload_bytes = 0
+        self._local_lock = threading.Lock()
+        self._thread = threading.local()
+        self._published = 0
+        self.payload_loads = 0
+        self.payload_evictions = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Idempotent, so workers starting together may all run it
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread: the event loop and each
+        # threadpool thread get their own
+        conn = getattr(self._thread, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._thread.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _next_version(self, conn) -> int:
+        conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'data_version'")
+        return conn.execute("SELECT value FROM counters WHERE name = 'data_version'").fetchone()[0]
+
+    # Per-worker decoded copies
+
+    def _remember(self, job_id: str, job: dict, size: int):
+        with self._local_lock:
+            _, old_size = self._local.pop(job_id, (None, 0))
+            self._local[job_id] = (job, size)
+            self._local_bytes += size - old_size
+            while len(self._local) > self.local_max:
+                _, (_, evicted_size) = self._local.popitem(last=False)
+                self._local_bytes -= evicted_size
+
+    def _remember_payload(self, job_id: str, payload_version: int, payload: dict, size: int):
+        with self._local_lock:
+            _, _, old_size = self._payloads.pop(job_id, (None, None, 0))
+            self._payloads[job_id] = (payload_version, payload, size)
+            self._payload_bytes += size - old_size
+            # The payload just stored always stays, even above the budget
+            while self._payload_bytes > self.payload_budget and len(self._payloads) > 1:
+                _, (_, _, evicted_size) = self._payloads.popitem(last=False)
+                self._payload_bytes -= evicted_size
+                self.payload_evictions += 1
+
+    def _decoded(self, job_id: str, version: int):
+        """
+        The locally decoded job metadata at `version`, loading it if the
+        local copy is missing or stale. Returns None if the job is gone.
+        """
+        with self._local_lock:
+            entry = self._local.get(job_id)
+            if entry is not None and entry[0].get("version") == version:
+                self._local.move_to_end(job_id)
+                return entry[0]
+
+        row = self._conn().execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = pickle.loads(row[0])
+        self._remember(job_id, job, decoded_size(job))
+        return job
+
+    def forget(self, job_id: str, before_version: int = None):
+        """
+        Drops this worker's decoded copies of a job (only if older than
+        `before_version`, when given).
+        """
+        with self._local_lock:
+            entry = self._local.get(job_id)
+            if entry is not None and (before_version is None or entry[0].get("version", 0) < before_version):
+                self._local_bytes -= self._local.pop(job_id)[1]
+            entry = self._payloads.get(job_id)
+            if entry is not None and (before_version is None or entry[0] < before_version):
+                self._payload_bytes -= self._payloads.pop(job_id)[2]
+
+    # Writes
+
+    def _split(self, job: dict):
+        meta = {k: v for k, v in job.items() if k not in PAYLOAD_FIELDS}
+        payload = {k: job[k] for k in PAYLOAD_FIELDS if k in job}
+        return meta, payload
+
+    def _write(self, conn, job_id: str, job: dict, payload, fields, created: bool):
+        """
+        Stores `job` (metadata) under a new version; `payload` is None
+        when the stored payload is unchanged. Returns (version, payload)
+        for a stored payload, else None.
+        """
+        version = self._next_version(conn)
+        job["version"] = version
+        if created:
+            job["created_version"] = version
+        field_versions = job.setdefault("field_versions", {})
+        for field in fields:
+            field_versions[field] = version
+
+        if payload is not None:
+            job["payload_version"] = version
+            results = payload.get("results")
+            job["result_count"] = len(results) if results is not None else 0
+
+        data = pickle.dumps(job, pickle.HIGHEST_PROTOCOL)
+        if payload is None:
+            conn.execute(
+                "UPDATE jobs SET version = ?, status = ?, updated_at = ?, data = ? WHERE job_id = ?",
+                (version, job["status"], time.time(), data, job_id)
+            )
+        else:
+            payload_data = pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, created_version, version, status, updated_at, data, payload)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, job["created_version"], version, job["status"], time.time(), data, payload_data)
+            )
+            payload = (version, payload)
+
+        self._publish(conn, JOBS_CHANNEL, {"job_id": job_id, "version": version, "fields": list(fields)})
+        return payload
+
+    def create(self, job_id: str, job: dict, fields=()) -> dict:
+        """
+        Stores a new job; `fields` are marked as changed at its first
+        version, which also becomes its created_version. Returns the
+        job's metadata.
+        """
+        meta, payload = self._split(job)
+        with self._transaction() as conn:
+            payload = self._write(conn, job_id, meta, payload, fields, created=True)
+        self._remember(job_id, meta, decoded_size(meta))
+        self._remember_payload(job_id, *payload, decoded_size(payload[1]))
+        return meta
+
+    def update(self, job_id: str, changes: dict, fields=(), expect_status: str = None):
+        """
+        Applies `changes` to the stored job under a new data version and
+        marks `fields` as changed. The read-modify-write is one
+        transaction, so concurrent updates from other workers are not
+        lost. Returns the updated metadata, or None if the job does not
+        exist or its status is not `expect_status`.
+        """
+        meta_changes, payload_changes = self._split(changes)
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT data, payload FROM jobs WHERE job_id = ?" if payload_changes else
+                "SELECT data FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = pickle.loads(row[0])
+            if expect_status is not None and job["status"] != expect_status:
+                return None
+
+            job.update(meta_changes)
+            payload = None
+            if payload_changes:
+                payload = pickle.loads(row[1])
+                payload.update(payload_changes)
+            payload = self._write(conn, job_id, job, payload, fields, created=False)
+
+        self._remember(job_id, job, decoded_size(job))
+        if payload is not None:
+            self._remember_payload(job_id, *payload, decoded_size(payload[1]))
+        return job
+
+    def _delete(self, conn, job_id: str) -> bool:
+        if conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,)).rowcount == 0:
+            return False
+        # Deletions take a version too, so list ETags and deltas move on
+        version = self._next_version(conn)
+        self._publish(conn, JOBS_CHANNEL, {"job_id": job_id, "version": version, "deleted": True})
+        return True
+
+    def expire(self, ttl_by_status: dict, now: float = None) -> list:
+        """
+        Deletes jobs whose status has a TTL in `ttl_by_status` (seconds,
+        None for no expiry) and that were last updated longer ago than
+        that. Returns the deleted job ids.
+        """
+        now = time.time() if now is None else now
+        expired = []
+        with self._transaction() as conn:
+            for status, ttl in ttl_by_status.items():
+                if ttl is None:
+                    continue
+                rows = conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = ? AND updated_at < ?", (status, now - ttl)
+                ).fetchall()
+                for (job_id,) in rows:
+                    if self._delete(conn, job_id):
+                        expired.append(job_id)
+        for job_id in expired:
+            self.forget(job_id)
+        return expired
+
+    # Reads
+
+    def get(self, job_id: str, default=None):
+        """
+        The job's metadata (everything but PAYLOAD_FIELDS), or `default`.
+        """
+        row = self._conn().execute("SELECT version FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return default
+        job = self._decoded(job_id, row[0])
+        return default if job is None else job
+
+    def payload(self, job_id: str, job: dict = None) -> dict:
+        """
+        The job's PAYLOAD_FIELDS, from memory or the database. Returns {}
+        if the job is gone.
+        """
+        job = job if job is not None else self.get(job_id)
+        if job is None:
+            return {}
+        wanted = job.get("payload_version", 0)
+
+        with self._local_lock:
+            entry = self._payloads.get(job_id)
+            if entry is not None and entry[0] >= wanted:
+                self._payloads.move_to_end(job_id)
+                return entry[1]
+
+        row = self._conn().execute("SELECT payload FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return {}
+        payload = pickle.loads(row[0])
+        self.payload_loads += 1
+        self._remember_payload(job_id, wanted, payload, decoded_size(payload))
+        return payload
+
+    def __contains__(self, job_id: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def items(self):
+        """
+        (job_id, metadata) pairs in creation order. Only jobs whose
+        version differs from the local copy are fetched and decoded.
+        """
+        rows = self._conn().execute("SELECT job_id, version FROM jobs ORDER BY created_version").fetchall()
+        for job_id, version in rows:
+            job = self._decoded(job_id, version)
+            if job is not None:
+                yield job_id, job
+
+    def status_counts(self) -> dict:
+        return dict(self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def version(self) -> int:
+        """
+        Current global data version.
+        """
+        return self._conn().execute("SELECT value FROM counters WHERE name = 'data_version'").fetchone()[0]
+
+    def memory(self) -> dict:
+        """
+        This worker's decoded job state. Sizes are decoded_size()
+        estimates of the Python objects held, taken when each was decoded
+        or written.
+        """
+        with self._local_lock:
+            return {
+                "jobs_decoded": len(self._local),
+                "job_bytes": self._local_bytes,
+                "payloads_decoded": len(self._payloads),
+                "payload_bytes": self._payload_bytes,
+                "payload_budget_bytes": self.payload_budget,
+                "payload_loads": self.payload_loads,
+                "payload_evictions": self.payload_evictions,
+            }
+
+    # Pub/sub: an append-only events table polled by every worker
+
+    def _publish(self, conn, channel: str, message: dict):
+        conn.execute(
+            "INSERT INTO events (channel, message, created_at) VALUES (?, ?, ?)",
+            (channel, json.dumps(message), time.time())
+        )
+        self._published += 1
+        if self._published % EVENT_PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM events WHERE created_at < ?", (time.time() - EVENT_RETENTION_SECONDS,))
+
+    def last_event(self) -> int:
+        row = self._conn().execute("SELECT MAX(seq) FROM events").fetchone()
+        return row[0] or 0
+
+    def events(self, after: int, channel: str = None):
+        """
+        Events published after sequence number `after` as
+        (seq, channel, message) tuples, oldest first.
+        """
+        query = "SELECT seq, channel, message FROM events WHERE seq > ?"
+        params = [after]
+        if channel is not None:
+            query += " AND channel = ?"
+            params.append(channel)
+        rows = self._conn().execute(query + " ORDER BY seq", params).fetchall()
+        return [(seq, name, json.loads(message)) for seq, name, message in rows]
+
+    def stats(self) -> dict:
+        try:
+            database_bytes = sum(
+                os.path.getsize(self.path + suffix) for suffix in ("", "-wal") if os.path.exists(self.path + suffix)
+            )
+        except OSError:
+            database_bytes = None
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "jobs": len(self),
+            "database_bytes": database_bytes,
+            "version": self.version(),
+            "worker_pid": os.getpid(),
+        }
@@ -0,0 +1,69 @@
+import re
+
+
+# Precompiled once at import time. Emails, URLs and phone numbers are folded
+# into a single alternation so the text is scanned once instead of three times.
+_EMAIL = r"\S+@\S+"
+_URL = r"http\S+|www\.\S+"
+_PHONE = r"\+?\d[\d\s\-\(\)]{8,}\d"
+
+NOISE_PATTERN = re.compile(f"{_EMAIL}|{_URL}|{_PHONE}")
+
+POST_NOISE = ("See more",)
+
+
+def collapse_whitespace(text: str) -> str:
+    """
+    Collapse runs of whitespace into single spaces and strip the ends.
+    str.split() does this in C and is faster than re.sub(r"\\s+", ...).
+    """
+    return " ".join(text.split())
+
+
+def normalize_skill(skill):
+    """Normalize skill names for better search"""
+    return (
+        skill.lower()
+        .replace(".js", "")
+        .replace(".", "")
+        .strip()
+    )
+
+
+def clean_resume_text(text: str) -> str:
+    """
+    Cleans resume text for NLP usage.
+    Removes emails, phone numbers, links, and extra spaces.
+    """
+    if not text:
+        return ""
+
+    text = NOISE_PATTERN.sub(" ", text.lower())
+    return collapse_whitespace(text)
+
+
+def clean_post_text(text: str) -> str:
+    """
+    Cleans scraped LinkedIn post text.
+    Removes "See more" markers and collapses newlines/whitespace.
+    """
+    if not text:
+        return ""
+
+    for marker in POST_NOISE:
+        if marker in text:
+            text = text.replace(marker, "")
+
+    return collapse_whitespace(text)
+
+
+def iter_clean_pages(pages):
+    """
+    Streaming variant of clean_resume_text.
+    Takes an iterable of raw page texts and yields cleaned text per page,
+    skipping pages that are empty after cleaning.
+    """
+    for page_text in pages:
+        cleaned = clean_resume_text(page_text)
+        if cleaned:
+            yield cleaned
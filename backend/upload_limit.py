@@ -0,0 +1,58 @@
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware capping request bodies on `paths` at `max_bytes`
+    plus `overhead_bytes`.
+
+    Starlette spools a multipart body completely before the endpoint
+    runs, so the limit has to apply here: a declared Content-Length over
+    the limit is answered with 413 before any of the body is read, and a
+    body without one (chunked) fails with 413 as soon as the bytes
+    received pass the limit.
+
+    The count covers the whole request body, multipart boundaries and
+    form fields included, so `overhead_bytes` leaves room for them: a
+    file just under `max_bytes` is still accepted.
+    """
+
+    def __init__(self, app, max_bytes: int, paths=(), overhead_bytes: int = 0):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.limit = max_bytes + overhead_bytes
+        self.paths = tuple(paths)
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {self.max_bytes // (1024 * 1024)} MB"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.limit:
+            error = self._too_large()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code,
+                                    headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = [0]
+
+        async def receive_limited():
+            message = await receive()
+            if message["type"] == "http.request":
+                received[0] += len(message.get("body", b""))
+                if received[0] > self.limit:
+                    # Raised inside body parsing; FastAPI passes HTTPExceptions through
+                    raise self._too_large()
+            return message
+
+        await self.app(scope, receive_limited, send)
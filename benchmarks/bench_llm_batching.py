@@ -0,0 +1,86 @@
+"""
+Throughput of LLM query generation under a burst of uploads, against the
+stand-in Ollama server: one-by-one calls (old behaviour) vs the
+micro-batched async path.
+
+Usage:
+    python benchmarks/bench_llm_batching.py [--jobs 24] [--latency 1.0] [--parallel 4] [--distinct 12]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from corpus import SKILLS, CITIES
+from fake_ollama import start_fake_ollama
+
+
+def make_profiles(jobs: int, distinct: int, seed: int = 0):
+    """
+    `jobs` upload profiles drawn from `distinct` unique skill/location sets.
+    """
+    rng = random.Random(seed)
+    unique = [
+        (rng.sample(SKILLS, 5), [rng.choice(CITIES)], "India")
+        for _ in range(distinct)
+    ]
+    return [unique[i % distinct] for i in range(jobs)]
+
+
+def run(jobs: int = 24, latency: float = 1.0, parallel: int = 4, distinct: int = 12):
+    server, url = start_fake_ollama(latency=latency, parallel=parallel)
+    os.environ["OLLAMA_URL"] = url
+
+    import query_builder_local_llm as qb
+    from disk_cache import DiskCache
+
+    profiles = make_profiles(jobs, distinct)
+    results = {}
+
+    # Serial: what each blocking upload handler used to do
+    qb.llm_cache = DiskCache(tempfile.mkdtemp(), ttl=qb.LLM_CACHE_TTL)
+    start = time.perf_counter()
+    for skills, locations, country in profiles:
+        qb.generate_queries_with_ollama(skills, locations, country, 12)
+    results["serial"] = time.perf_counter() - start
+    serial_calls = server.stats["generate"]
+
+    # Batched: all uploads in flight at once through the async path
+    qb.llm_cache = DiskCache(tempfile.mkdtemp(), ttl=qb.LLM_CACHE_TTL)
+
+    async def burst():
+        await asyncio.gather(*[
+            qb.agenerate_queries_with_ollama(skills, locations, country, 12)
+            for skills, locations, country in profiles
+        ])
+
+    start = time.perf_counter()
+    asyncio.run(burst())
+    results["batched"] = time.perf_counter() - start
+    batched_calls = server.stats["generate"] - serial_calls
+
+    server.shutdown()
+
+    print(f"\n📊 LLM query generation: {jobs} jobs, {distinct} distinct profiles, "
+          f"{latency}s/generation, server parallel={parallel}")
+    print("=" * 60)
+    for mode, calls in (("serial", serial_calls), ("batched", batched_calls)):
+        seconds = results[mode]
+        print(f"  {mode:8} {seconds:7.2f} s  {jobs / seconds * 60:8.1f} jobs/min  ({calls} generations)")
+    print(f"  batcher stats: {qb.query_batcher.stats}")
+    print("=" * 60 + "\n")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--distinct", type=int, default=12)
+    args = parser.parse_args()
+    run(args.jobs, args.latency, args.parallel, args.distinct)
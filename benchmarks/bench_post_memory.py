@@ -0,0 +1,72 @@
+"""
+Memory and ranking cost of a job's posts: list of dicts (as submitted)
+vs Post objects vs the columnar PostColumns store.
+
+Posts go through a JSON round trip first so strings are separate objects,
+as they are when the agent's payload is parsed.
+
+Usage:
+    python benchmarks/bench_post_memory.py [--posts 10000]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from corpus import make_posts, make_resume_text
+
+from post_store import Post, PostColumns
+from ranker import rank_posts
+
+
+def measure_memory(build):
+    """
+    Bytes still allocated by the object `build` returns (strings included).
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        obj = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return obj, current
+
+
+def run(count: int):
+    payload = json.dumps({"results": make_posts(count, seed=count)})
+    resume_text = make_resume_text(seed=7).lower()
+
+    layouts = {
+        "dicts": lambda: json.loads(payload)["results"],
+        "Post objects": lambda: [Post.from_dict(p) for p in json.loads(payload)["results"]],
+        "PostColumns": lambda: PostColumns.from_dicts(json.loads(payload)["results"]),
+    }
+
+    report = {}
+    for name, build in layouts.items():
+        posts, size = measure_memory(build)
+        ranked_input = posts if name != "Post objects" else [p.to_dict() for p in posts]
+        start = time.perf_counter()
+        rank_posts(resume_text, ranked_input, top_k=20)
+        report[name] = {"bytes": size, "rank_seconds": time.perf_counter() - start}
+        del posts, ranked_input
+
+    baseline = report["dicts"]["bytes"]
+    print(f"\n📊 {count} posts in memory")
+    print("=" * 66)
+    for name, r in report.items():
+        print(f"  {name:14} {r['bytes'] / 1024 / 1024:8.2f} MB  {r['bytes'] / count:7.0f} B/post  "
+              f"{(1 - r['bytes'] / baseline) * 100:5.1f}% saved  rank {r['rank_seconds']:.2f}s")
+    print("=" * 66 + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=10000)
+    args = parser.parse_args()
+    run(args.posts)
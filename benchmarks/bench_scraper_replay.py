@@ -0,0 +1,157 @@
+"""
+Offline scraper benchmark: replays recorded LinkedIn search pages through
+Playwright route interception and times _scrape_query and
+extract_post_url under different wait profiles.
+
+Record real pages once (logged in, via the local agent or directly):
+    scrape_posts(queries, record_dir="recordings/")
+
+Then benchmark against them:
+    python benchmarks/bench_scraper_replay.py --recordings recordings/ [--output replay.json]
+
+Without --recordings the saved fixture (fixtures/linkedin_search.html) is
+recorded under a few synthetic queries first.
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+from corpus import SKILLS
+from html_fixtures import load_search_fixture
+
+import linkedin_scraper
+from linkedin_scraper import build_search_url, enable_replay, extract_post_url, save_recording
+
+POST_SELECTORS = [
+    "div.feed-shared-update-v2",
+    "li.reusable-search__result-container",
+    "div.search-results-container li",
+    "div[data-id*='urn:li:activity']",
+]
+
+# Fixed waits per profile, applied to the linkedin_scraper constants
+WAIT_PROFILES = {
+    "default": {
+        "LOAD_WAIT": linkedin_scraper.LOAD_WAIT,
+        "SCROLL_WAIT": linkedin_scraper.SCROLL_WAIT,
+        "POST_SCROLL_WAIT": linkedin_scraper.POST_SCROLL_WAIT,
+    },
+    "short": {"LOAD_WAIT": 1, "SCROLL_WAIT": 0.25, "POST_SCROLL_WAIT": 0.1},
+    "none": {"LOAD_WAIT": 0, "SCROLL_WAIT": 0, "POST_SCROLL_WAIT": 0},
+}
+
+
+def seed_recordings(queries, time_filter: str = "past-week") -> str:
+    directory = tempfile.mkdtemp(prefix="scraper_replay_")
+    html = load_search_fixture()
+    for query in queries:
+        save_recording(directory, build_search_url(query, time_filter), html, query)
+    return directory
+
+
+def bench_extract_post_url(page) -> dict:
+    posts = None
+    for selector in POST_SELECTORS:
+        posts = page.locator(selector)
+        if posts.count() > 0:
+            break
+
+    timings = []
+    found = 0
+    for i in range(posts.count() if posts else 0):
+        start = time.perf_counter()
+        if extract_post_url(posts.nth(i)):
+            found += 1
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "posts": len(timings),
+        "urls_found": found,
+        "median_ms": round(statistics.median(timings) * 1000, 3) if timings else None,
+        "total_seconds": round(sum(timings), 4),
+    }
+
+
+def run(recordings: str, profiles, limit: int = 10, time_filter: str = "past-week") -> dict:
+    from playwright.sync_api import sync_playwright
+
+    report = {"recordings": recordings, "profiles": {}}
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        manifest = enable_replay(page, recordings)
+        queries = [entry.get("query") for entry in manifest.values() if entry.get("query")]
+        print(f"📼 Replaying {len(queries)} recorded queries from {recordings}")
+
+        for name in profiles:
+            for constant, value in WAIT_PROFILES[name].items():
+                setattr(linkedin_scraper, constant, value)
+
+            traces = []
+            kept = 0
+            start = time.perf_counter()
+            for query in queries:
+                stats = {}
+                kept += len(linkedin_scraper._scrape_query(page, query, limit=limit, time_filter=time_filter,
+                                                           stats=stats))
+                traces.append(stats)
+            seconds = time.perf_counter() - start
+
+            waits = sum(v for t in traces for k, v in t.get("timings", {}).items() if k.endswith("_wait"))
+            report["profiles"][name] = {
+                "queries": len(queries),
+                "kept": kept,
+                "checked": sum(t.get("checked", 0) for t in traces),
+                "seconds": round(seconds, 3),
+                "fixed_sleep_seconds": round(waits, 3),
+                "work_seconds": round(seconds - waits, 3),
+                "seconds_per_query": round(seconds / max(len(queries), 1), 3),
+            }
+
+        # Page is still on the last replayed search
+        report["extract_post_url"] = bench_extract_post_url(page)
+        browser.close()
+
+    for constant, value in WAIT_PROFILES["default"].items():
+        setattr(linkedin_scraper, constant, value)
+    return report
+
+
+def print_report(report: dict):
+    print("\n📊 Scraper replay benchmark")
+    print("=" * 78)
+    print(f"  {'profile':10} {'queries':>8} {'kept':>6} {'checked':>8} {'total s':>9} {'sleep s':>9} {'work s':>8}")
+    for name, r in report["profiles"].items():
+        print(f"  {name:10} {r['queries']:8} {r['kept']:6} {r['checked']:8} "
+              f"{r['seconds']:9.2f} {r['fixed_sleep_seconds']:9.2f} {r['work_seconds']:8.2f}")
+
+    kept = {r["kept"] for r in report["profiles"].values()}
+    if len(kept) > 1:
+        print("  ⚠️ Profiles kept different numbers of posts: shorter waits lose content")
+
+    e = report["extract_post_url"]
+    print(f"\n  extract_post_url: {e['urls_found']}/{e['posts']} URLs, median {e['median_ms']} ms per post")
+    print("=" * 78 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recordings", help="directory written by scrape_posts(record_dir=...)")
+    parser.add_argument("--queries", type=int, default=3, help="synthetic queries when seeding from the fixture")
+    parser.add_argument("--profiles", default=",".join(WAIT_PROFILES), help="wait profiles to compare")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    recordings = args.recordings or seed_recordings([f"{s} developer hiring" for s in SKILLS[:args.queries]])
+    report = run(recordings, args.profiles.split(","), args.limit)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
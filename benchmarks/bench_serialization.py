@@ -0,0 +1,97 @@
+"""
+Serialization time and response size for /results payloads:
+FastAPI's default path (jsonable_encoder + stdlib json) vs the orjson
+response class vs a payload-cache hit, plus gzip/brotli sizes and costs.
+
+Usage:
+    python benchmarks/bench_serialization.py [--posts 100,500,2000] [--output serialization.json]
+"""
+
+import argparse
+import json
+import time
+
+from corpus import make_posts
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import responses
+from responses import APIResponse, PayloadCache, compress
+
+
+def results_payload(posts):
+    return {
+        "success": True,
+        "job_id": "bench",
+        "version": 1,
+        "status": "completed",
+        "skills": ["python", "react", "sql"],
+        "queries": [p["query"] for p in posts[:12]],
+        "queries_source": "llm",
+        "results": posts,
+        "result_count": len(posts),
+    }
+
+
+def per_call(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(sizes, repeat: int = 50):
+    report = {"orjson": responses.orjson is not None, "brotli": responses.brotli is not None, "cases": {}}
+
+    for size in sizes:
+        payload = results_payload(make_posts(size, seed=size))
+        cache = PayloadCache()
+        cache.response(("bench", 1), lambda: payload, "gzip")
+
+        case = {
+            "default_ms": per_call(lambda: JSONResponse(jsonable_encoder(payload)), repeat) * 1000,
+            "orjson_ms": per_call(lambda: APIResponse(payload), repeat) * 1000,
+            "cache_hit_gzip_ms": per_call(lambda: cache.response(("bench", 1), lambda: payload, "gzip"), repeat) * 1000,
+        }
+
+        body = APIResponse(payload).body
+        case["bytes"] = len(body)
+        encodings = ["gzip"] + (["br"] if responses.brotli else [])
+        for encoding in encodings:
+            case[f"{encoding}_bytes"] = len(compress(body, encoding))
+            case[f"{encoding}_ms"] = per_call(lambda: compress(body, encoding), max(repeat // 5, 1)) * 1000
+
+        report["cases"][size] = {k: round(v, 3) if isinstance(v, float) else v for k, v in case.items()}
+
+    return report
+
+
+def print_report(report: dict):
+    print(f"\n📊 /results serialization (orjson: {report['orjson']}, brotli: {report['brotli']})")
+    print("=" * 96)
+    print(f"  {'posts':>6} {'default ms':>11} {'orjson ms':>10} {'cached ms':>10} "
+          f"{'raw KB':>8} {'gzip KB':>8} {'gzip ms':>8} {'br KB':>7} {'br ms':>7}")
+    for size, c in report["cases"].items():
+        br_kb = f"{c['br_bytes'] / 1024:7.1f}" if "br_bytes" in c else f"{'-':>7}"
+        br_ms = f"{c['br_ms']:7.2f}" if "br_ms" in c else f"{'-':>7}"
+        print(f"  {size:>6} {c['default_ms']:11.2f} {c['orjson_ms']:10.2f} {c['cache_hit_gzip_ms']:10.3f} "
+              f"{c['bytes'] / 1024:8.1f} {c['gzip_bytes'] / 1024:8.1f} {c['gzip_ms']:8.2f} {br_kb} {br_ms}")
+    print("=" * 96 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", default="100,500,2000")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    report = run([int(s) for s in args.posts.split(",")], args.repeat)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
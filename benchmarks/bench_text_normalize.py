@@ -0,0 +1,74 @@
+"""
+Micro-benchmark: legacy chained re.sub cleaning vs text_normalizer.
+
+Usage:
+    python benchmarks/bench_text_normalize.py [--resumes 200] [--posts 5000]
+"""
+
+import argparse
+import re
+import time
+
+from corpus import make_resume_pages, make_post
+
+from text_normalizer import clean_resume_text, clean_post_text, iter_clean_pages
+
+
+def legacy_clean_resume_text(text: str) -> str:
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r"\S+@\S+", " ", text)
+    text = re.sub(r"\+?\d[\d\s\-\(\)]{8,}\d", " ", text)
+    text = re.sub(r"http\S+|www\.\S+", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def legacy_clean_text(text: str) -> str:
+    text = text.replace("See more", "")
+    text = text.replace("\n", " ")
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def _time(fn, items, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(resume_count: int = 200, post_count: int = 5000):
+    resumes_pages = [make_resume_pages(seed=i, pages=3) for i in range(resume_count)]
+    resumes = ["\n".join(pages) for pages in resumes_pages]
+    posts = [make_post(seed=i) for i in range(post_count)]
+
+    results = {
+        "resume_legacy": _time(legacy_clean_resume_text, resumes),
+        "resume_normalizer": _time(clean_resume_text, resumes),
+        "resume_streaming": _time(lambda pages: " ".join(iter_clean_pages(pages)), resumes_pages),
+        "post_legacy": _time(legacy_clean_text, posts),
+        "post_normalizer": _time(clean_post_text, posts),
+    }
+
+    print(f"\n📊 Text normalization ({resume_count} resumes, {post_count} posts, best of 5)")
+    print("=" * 60)
+    for name, seconds in results.items():
+        print(f"  {name:20} {seconds * 1000:9.2f} ms")
+    print("=" * 60)
+    print(f"  resume speedup: {results['resume_legacy'] / results['resume_normalizer']:.2f}x")
+    print(f"  post speedup:   {results['post_legacy'] / results['post_normalizer']:.2f}x\n")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.resumes, args.posts)
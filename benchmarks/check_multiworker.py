@@ -0,0 +1,170 @@
+"""
+Consistency check for multi-worker deployments (uvicorn --workers N).
+
+Jobs are created, read, submitted and listed over fresh connections, so
+consecutive requests land on different worker processes. Every worker
+must see every job at the same version: the agent may submit to one
+worker while the browser polls another.
+
+Usage:
+    # start fake Ollama + uvicorn with 4 workers on a throwaway database
+    python benchmarks/check_multiworker.py --spawn [--workers 4] [--jobs 8]
+
+    # or against a running server
+    python benchmarks/check_multiworker.py --url http://127.0.0.1:8000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from corpus import make_posts, make_resume_pages
+from pdf_fixtures import make_pdf
+
+# Connection: close makes every request a new accept(), spread over workers
+FRESH = {"Connection": "close"}
+READS_PER_CHECK = 12
+
+
+class Check:
+    def __init__(self, url: str):
+        self.url = url
+        self.failures = []
+        self.pids = set()
+
+    def get(self, path: str, **params):
+        resp = requests.get(f"{self.url}{path}", params=params, headers=FRESH, timeout=30)
+        return resp.status_code, resp.json() if resp.content else {}
+
+    def expect(self, ok: bool, message: str):
+        if not ok:
+            self.failures.append(message)
+            print(f"   ❌ {message}")
+
+    def fan_out(self, fn, count: int = READS_PER_CHECK):
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            return list(pool.map(lambda _: fn(), range(count)))
+
+    def health(self):
+        status, body = self.get("/health")
+        pid = body.get("shared_state", {}).get("worker_pid")
+        if pid:
+            self.pids.add(pid)
+        return status, body
+
+
+def run(url: str, jobs: int = 8, posts_per_job: int = 200) -> Check:
+    check = Check(url)
+
+    print(f"\n🔎 Checking shared job state across workers at {url}")
+    check.fan_out(check.health, READS_PER_CHECK * 2)
+
+    resume = make_pdf([p.split("\n") for p in make_resume_pages(seed=0)])
+
+    def create(_):
+        resp = requests.post(f"{url}/process-resume", headers=FRESH, timeout=120,
+                             files={"file": ("resume.pdf", resume, "application/pdf")})
+        return resp.json()["job_id"] if resp.status_code == 200 else None
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        job_ids = list(pool.map(create, range(jobs)))
+    check.expect(all(job_ids), f"only {sum(1 for j in job_ids if j)}/{jobs} jobs were created")
+    job_ids = [j for j in job_ids if j]
+    print(f"   Created {len(job_ids)} jobs")
+
+    # Visible everywhere right after creation, at one version per job
+    versions = {}
+    for job_id in job_ids:
+        reads = check.fan_out(lambda: check.get(f"/results/{job_id}", fields="status"))
+        seen = {(status, body.get("version"), body.get("status")) for status, body in reads}
+        check.expect(len(seen) == 1 and next(iter(seen))[0] == 200,
+                     f"job {job_id[:8]} read inconsistently after creation: {sorted(seen, key=str)}")
+        versions[job_id] = next(iter(seen))[1]
+
+        agent_reads = check.fan_out(lambda: check.get(f"/api/results/{job_id}")[0], 4)
+        check.expect(agent_reads == [200] * 4, f"agent could not fetch job {job_id[:8]}: {agent_reads}")
+
+    check.expect(len(set(versions.values())) == len(versions), "two jobs were given the same version")
+
+    # Submit through one worker, read back through all of them
+    for i, job_id in enumerate(job_ids):
+        posts = make_posts(posts_per_job, seed=i)
+        resp = requests.post(f"{url}/api/submit-results/{job_id}", json={"results": posts},
+                             headers=FRESH, timeout=60)
+        check.expect(resp.status_code == 200, f"submit for {job_id[:8]} failed: {resp.status_code}")
+
+        reads = check.fan_out(lambda: check.get(f"/results/{job_id}", fields="status,result_count"))
+        seen = {(status, json.dumps(body, sort_keys=True)) for status, body in reads}
+        check.expect(len(seen) == 1, f"job {job_id[:8]} read inconsistently after submit: {len(seen)} variants")
+        completed = [body for status, body in reads
+                     if status == 200 and body.get("status") == "completed" and body.get("result_count") == posts_per_job]
+        check.expect(len(completed) == len(reads),
+                     f"job {job_id[:8]} completed on {len(completed)}/{len(reads)} reads")
+        check.expect(all(body["version"] > (versions[job_id] or 0) for body in completed),
+                     f"job {job_id[:8]} version did not advance")
+
+        ranks = check.fan_out(lambda: check.get(f"/rank/{job_id}", top_k=5), 4)
+        check.expect(len({json.dumps(b, sort_keys=True) for _, b in ranks}) == 1,
+                     f"/rank/{job_id[:8]} differs between workers")
+
+    # Every worker lists the same jobs at the same data version
+    listings = check.fan_out(lambda: check.get("/jobs", fields="status,version"))
+    seen = {json.dumps(body, sort_keys=True) for _, body in listings}
+    check.expect(len(seen) == 1, f"/jobs differs between workers: {len(seen)} variants")
+    listed = listings[0][1].get("jobs", {})
+    check.expect(all(job_id in listed for job_id in job_ids), "/jobs is missing jobs")
+
+    check.fan_out(check.health, READS_PER_CHECK * 2)
+    return check
+
+
+def spawn(workers: int, port: int):
+    from fake_ollama import start_fake_ollama
+    from load_test import spawn_server
+
+    # Throwaway shared database so the check never sees earlier jobs
+    os.environ["SHARED_STATE_DB"] = os.path.join(tempfile.mkdtemp(prefix="shared_state_"), "shared_state.db")
+    server, ollama_url = start_fake_ollama(latency=0.1)
+    process = spawn_server(port, workers, ollama_url)
+    print(f"🚀 Spawned uvicorn ({workers} workers) on port {port}, database {os.environ['SHARED_STATE_DB']}")
+    return server, process
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--posts", type=int, default=200, help="posts submitted per job")
+    parser.add_argument("--spawn", action="store_true", help="start fake Ollama + uvicorn locally")
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn workers for --spawn")
+    parser.add_argument("--port", type=int, default=8765, help="port for --spawn")
+    args = parser.parse_args()
+
+    server = process = None
+    url = args.url
+    if args.spawn:
+        server, process = spawn(args.workers, args.port)
+        url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        result = run(url, args.jobs, args.posts)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if server is not None:
+            server.shutdown()
+
+    print(f"\n   Requests were served by {len(result.pids)} worker process(es)")
+    if len(result.pids) < 2:
+        print("   ⚠️ Only one worker answered; run with --workers 2 or more for a meaningful check")
+
+    if result.failures:
+        print(f"\n❌ {len(result.failures)} consistency check(s) failed\n")
+        sys.exit(1)
+    print("\n✅ All workers saw the same jobs at the same versions\n")
@@ -0,0 +1,95 @@
+"""
+Synthetic resumes and LinkedIn posts for benchmarks.
+Deterministic for a given seed so runs can be compared (post times are
+relative to `now`).
+"""
+
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+SKILLS = [
+    "python", "java", "javascript", "sql", "react", "next.js", "node.js",
+    "express", "mongodb", "machine learning", "deep learning", "data science",
+    "docker", "aws", "git", "github", "ai", "ml",
+]
+
+CITIES = ["Bangalore", "Chennai", "Pune", "Hyderabad", "London", "Toronto", "Berlin", "Seattle"]
+
+# Relative ages LinkedIn shows with past-week / past-month searches
+POST_AGES_HOURS = [1, 3, 8, 24, 48, 72, 24 * 7, 24 * 14, 24 * 30]
+
+RESUME_LINES = [
+    "Built a {skill} service handling {n}k requests per day in {city}.",
+    "Led migration of legacy systems to {skill} and {skill2}.",
+    "Contact: jane.doe{n}@example.com | +91 98765 {n:05d} | www.portfolio{n}.dev",
+    "Projects: https://github.com/user{n}/{skill}-toolkit",
+    "Intern, {city} — worked on {skill} pipelines and {skill2} dashboards.",
+    "Coursework: data structures, algorithms, {skill}, operating systems.",
+]
+
+POST_TEMPLATES = [
+    "We are hiring a {skill} developer in {city}!\nSend your resume to jobs{n}@corp.com.\n\nSee more",
+    "Excited to share that I joined {city} office as a {skill} engineer. See more",
+    "Looking for {skill} and {skill2} interns. Apply now: https://careers.example.com/{n}\n See more",
+    "Congratulations to the team on the {skill} launch!\n\n\n#{skill2}",
+    "Opening for a remote {skill} engineer, {n} years experience.   DM to apply.\nSee more",
+]
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        skill=rng.choice(SKILLS),
+        skill2=rng.choice(SKILLS),
+        city=rng.choice(CITIES),
+        n=rng.randint(1, 99999),
+    )
+
+
+def make_resume_pages(seed: int = 0, pages: int = 2, lines_per_page: int = 40):
+    """
+    Returns a list of raw page texts for one synthetic resume.
+    """
+    rng = random.Random(seed)
+    return [
+        "\n".join(_fill(rng.choice(RESUME_LINES), rng) for _ in range(lines_per_page))
+        for _ in range(pages)
+    ]
+
+
+def make_resume_text(seed: int = 0, pages: int = 2, lines_per_page: int = 40) -> str:
+    return "\n".join(make_resume_pages(seed, pages, lines_per_page))
+
+
+def make_post(seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return _fill(rng.choice(POST_TEMPLATES), rng)
+
+
+def make_posts(count: int, seed: int = 0, now: float = None):
+    """
+    Returns `count` scraped-post dicts shaped like linkedin_scraper results,
+    posted one of POST_AGES_HOURS before `now` (default the current time).
+    """
+    now = time.time() if now is None else now
+    rng = random.Random(seed)
+    # Separate stream, so adding post times left the seeded contents unchanged
+    ages = random.Random(seed + 1)
+    posts = []
+    for i in range(count):
+        content = " ".join(_fill(rng.choice(POST_TEMPLATES), rng).split())
+        posts.append({
+            "query": f"{rng.choice(SKILLS)} developer hiring {rng.choice(CITIES)}",
+            "author": f"Recruiter {rng.randint(1, 500)}",
+            "content": content[:500],
+            "post_url": f"https://www.linkedin.com/feed/update/urn:li:activity:{7000000000 + i}/",
+            "links": [f"https://www.linkedin.com/feed/update/urn:li:activity:{7000000000 + i}/"],
+            "posted_at": now - ages.choice(POST_AGES_HOURS) * 3600,
+        })
+    return posts
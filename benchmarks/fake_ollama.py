@@ -0,0 +1,149 @@
+"""
+Stand-in HTTP server mimicking the parts of the Ollama API the backend uses
+(/api/tags and /api/generate, streaming and non-streaming).
+
+Usage:
+    python benchmarks/fake_ollama.py [--port 11434] [--latency 2.0] [--parallel 4]
+
+Then point the backend at it with OLLAMA_URL=http://127.0.0.1:<port>.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+MODEL_NAME = "llama3.1:8b"
+
+
+def fake_completion(prompt: str) -> str:
+    """
+    Deterministic model output: a JSON array of queries built from the
+    skills and country named in the prompt.
+    """
+    skills_match = re.search(r"technical skills: (.*)", prompt)
+    skills = [s.strip() for s in skills_match.group(1).split(",")] if skills_match else ["software"]
+    country_match = re.search(r'Include country in queries: "([^"]+)"', prompt)
+    country = country_match.group(1) if country_match else "India"
+    count_match = re.search(r"Create (\d+) LinkedIn", prompt)
+    count = int(count_match.group(1)) if count_match else 12
+
+    patterns = ["{s} developer hiring {c}", "{s} internship {c}", "hiring {s} engineer {c}", "{s} job opening {c}"]
+    queries = []
+    for i in range(count):
+        skill = skills[i % len(skills)]
+        queries.append(patterns[(i // len(skills)) % len(patterns)].format(s=skill, c=country))
+
+    return "Here are the queries:\n" + json.dumps(queries) + "\nLet me know if you need more."
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.stats["requests"] += 1
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": MODEL_NAME}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        self.server.stats["requests"] += 1
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path != "/api/generate":
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        self.server.stats["generate"] += 1
+        text = fake_completion(request.get("prompt", ""))
+
+        # Like the real server, only `parallel` generations run at once
+        with self.server.slots:
+            self._generate(request, text)
+
+    def _generate(self, request, text):
+        if not request.get("stream", True):
+            time.sleep(self.server.latency)
+            self._send_json({"model": request.get("model"), "response": text, "done": True})
+            return
+
+        # Streaming: one NDJSON line per token-ish chunk, chunked encoding
+        tokens = re.findall(r"\S+\s*", text)
+        token_delay = self.server.latency / max(len(tokens), 1)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for token in tokens:
+                time.sleep(token_delay)
+                self._write_chunk({"model": request.get("model"), "response": token, "done": False})
+                self.server.stats["tokens"] += 1
+            self._write_chunk({"model": request.get("model"), "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading early
+            self.server.stats["aborted"] += 1
+            self.close_connection = True
+
+    def _write_chunk(self, payload):
+        line = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):X}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.0, parallel: int = 4):
+        super().__init__(address, FakeOllamaHandler)
+        self.latency = latency
+        self.slots = threading.BoundedSemaphore(parallel)
+        self.stats = {"requests": 0, "generate": 0, "tokens": 0, "aborted": 0, "connections": 0}
+
+    def process_request(self, request, client_address):
+        self.stats["connections"] += 1
+        super().process_request(request, client_address)
+
+
+def start_fake_ollama(port: int = 0, latency: float = 0.0, parallel: int = 4):
+    """
+    Starts the stand-in server on a background thread.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    server = FakeOllamaServer(("127.0.0.1", port), latency=latency, parallel=parallel)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=2.0, help="seconds per generation")
+    parser.add_argument("--parallel", type=int, default=4, help="concurrent generations (OLLAMA_NUM_PARALLEL)")
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(("127.0.0.1", args.port), latency=args.latency, parallel=args.parallel)
+    print(f"🤖 Fake Ollama listening on http://127.0.0.1:{args.port} (latency {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,96 @@
+"""
+Saved LinkedIn search-result pages for benchmarking the scraper offline.
+
+The markup mirrors the selectors linkedin_scraper looks for, and varies
+per post so the content, author, post URL and post age fallbacks all get
+exercised.
+
+Usage (regenerates the saved fixture):
+    python benchmarks/html_fixtures.py [--posts 20]
+"""
+
+import argparse
+import html
+import os
+import time
+
+from corpus import make_posts
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEARCH_FIXTURE = os.path.join(FIXTURES_DIR, "linkedin_search.html")
+
+# (content wrapper, author wrapper) variants, cycled over the posts
+MARKUP_VARIANTS = [
+    ('<span class="break-words">{content}</span>',
+     '<span class="update-components-actor__name"><span aria-hidden="true">{author}</span></span>'),
+    ('<div class="update-components-text"><span>{content}</span></div>',
+     '<span class="update-components-actor__name">{author}</span>'),
+    ('<div class="feed-shared-update-v2__description">{content}</div>',
+     '<div class="update-components-actor__meta"><a href="#"><span>{author}</span></a></div>'),
+    ('<div class="feed-shared-inline-show-more-text">{content}</div>',
+     '<a class="app-aware-link" href="/in/someone"><span aria-hidden="true">{author}</span></a>'),
+]
+
+
+def _age_label(age_hours: float) -> str:
+    for unit, hours in (("w", 24 * 7), ("d", 24), ("h", 1)):
+        if age_hours >= hours:
+            return f"{int(age_hours // hours)}{unit}"
+    return "now"
+
+
+def _post_html(index: int, post: dict, now: float) -> str:
+    content_tpl, author_tpl = MARKUP_VARIANTS[index % len(MARKUP_VARIANTS)]
+    activity = post["post_url"].rstrip("/").split(":")[-1]
+    age = _age_label((now - post["posted_at"]) / 3600)
+
+    # Alternate between the URL strategies extract_post_url tries
+    if index % 3 == 0:
+        attrs, link = f' data-urn="urn:li:activity:{activity}"', ""
+    elif index % 3 == 1:
+        attrs, link = "", f'<a class="app-aware-link" href="/feed/update/urn:li:activity:{activity}/?trk=x">{age}</a>'
+    else:
+        attrs, link = "", f'<a href="https://www.linkedin.com/posts/urn:li:activity:{activity}">post</a>'
+
+    # The age label sits in the actor sub-description, except where only the timestamp link has it
+    sub_description = "" if index % 3 == 1 else (
+        f'<span class="update-components-actor__sub-description">{age} • </span>'
+    )
+
+    return (
+        f'<div class="feed-shared-update-v2"{attrs}>'
+        f'{author_tpl.format(author=html.escape(post["author"]))}{sub_description}'
+        f'{content_tpl.format(content=html.escape(post["content"]))}'
+        f'{link}<a href="https://careers.example.com/{activity}">Apply</a>'
+        f'</div>'
+    )
+
+
+def make_search_html(posts, now: float = None) -> str:
+    """
+    A search results page listing `posts`, with age labels as of `now`
+    (default the current time).
+    """
+    now = time.time() if now is None else now
+    body = "\n".join(_post_html(i, post, now) for i, post in enumerate(posts))
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Search | LinkedIn</title></head>"
+        f"<body><div class=\"search-results-container\">\n{body}\n</div></body></html>\n"
+    )
+
+
+def load_search_fixture() -> str:
+    with open(SEARCH_FIXTURE, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=20)
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    with open(SEARCH_FIXTURE, "w", encoding="utf-8") as f:
+        now = time.time()
+        f.write(make_search_html(make_posts(args.posts, seed=1, now=now), now))
+    print(f"💾 Wrote {args.posts} posts to {SEARCH_FIXTURE}")
@@ -0,0 +1,319 @@
+"""
+Load generator for the FastAPI backend (pure asyncio, no extra deps).
+
+Each virtual user replays the real job flow over a keep-alive connection:
+upload a resume to /process-resume, poll /results/{job_id}, submit
+scraped posts to /api/submit-results/{job_id}, then call /rank/{job_id}.
+A canary task pings /health on its own connection throughout; if a
+handler blocks the event loop the canary's latency jumps with it.
+
+Usage:
+    # against a running server (start fake_ollama.py and point OLLAMA_URL at it)
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 [--users 16] [--duration 30]
+
+    # or let the harness start the stand-in Ollama and uvicorn itself
+    python benchmarks/load_test.py --spawn [--workers 1] [--ollama-latency 1.0]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from corpus import BACKEND_DIR, make_posts, make_resume_pages
+from pdf_fixtures import make_pdf
+
+CANARY_INTERVAL = 0.05
+CONNECT_TIMEOUT = 10
+REQUEST_TIMEOUT = 120
+
+
+class HttpConnection:
+    """
+    Minimal HTTP/1.1 keep-alive client: Content-Length and chunked
+    responses, reconnects when the server closes the connection.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), CONNECT_TIMEOUT
+        )
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.writer = None
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers=None):
+        if self.writer is None or self.writer.is_closing():
+            await self._connect()
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}"]
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        try:
+            return await asyncio.wait_for(self._read_response(), REQUEST_TIMEOUT)
+        except Exception:
+            await self.close()
+            raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await self.reader.readline()).strip() or b"0", 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+            body = bytes(body)
+        else:
+            body = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection") == "close":
+            await self.close()
+        return status, body
+
+
+def multipart_file(field: str, filename: str, content: bytes, content_type: str = "application/pdf"):
+    boundary = f"----loadtest{random.getrandbits(64):x}"
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("latin-1") + content + f"\r\n--{boundary}--\r\n".encode("latin-1")
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank
+    idx = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    async def call(self, conn: HttpConnection, name: str, method: str, path: str, body=b"", headers=None):
+        start = time.perf_counter()
+        try:
+            status, payload = await conn.request(method, path, body, headers)
+        except Exception:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return None, None
+        self.latencies.setdefault(name, []).append(time.perf_counter() - start)
+        if status >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        return status, payload
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies.get(name, []))
+            endpoints[name] = {
+                "requests": len(values),
+                "errors": self.errors.get(name, 0),
+                "rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p90_ms": round(percentile(values, 90) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round((values[-1] if values else 0.0) * 1000, 1),
+            }
+        return endpoints
+
+
+async def user_flow(recorder: Recorder, host: str, port: int, resumes, posts, stop_at: float,
+                    polls: int, ranks: int, flows_done: list, rng: random.Random):
+    conn = HttpConnection(host, port)
+    try:
+        while time.perf_counter() < stop_at:
+            pdf = rng.choice(resumes)
+            body, headers = multipart_file("file", "resume.pdf", pdf)
+            status, payload = await recorder.call(conn, "POST /process-resume", "POST", "/process-resume", body, headers)
+            if status != 200:
+                await asyncio.sleep(0.1)
+                continue
+            job_id = json.loads(payload)["job_id"]
+
+            for _ in range(polls):
+                await recorder.call(conn, "GET /results/{job_id}", "GET", f"/results/{job_id}")
+
+            submission = json.dumps({"results": rng.sample(posts, min(len(posts), 50))}).encode("utf-8")
+            await recorder.call(conn, "POST /api/submit-results/{job_id}", "POST",
+                                f"/api/submit-results/{job_id}", submission, {"Content-Type": "application/json"})
+
+            for _ in range(ranks):
+                await recorder.call(conn, "GET /rank/{job_id}", "GET", f"/rank/{job_id}?top_k=20")
+
+            flows_done[0] += 1
+    finally:
+        await conn.close()
+
+
+async def canary(recorder: Recorder, host: str, port: int, stop_at: float):
+    conn = HttpConnection(host, port)
+    try:
+        while time.perf_counter() < stop_at:
+            await recorder.call(conn, "canary GET /health", "GET", "/health")
+            await asyncio.sleep(CANARY_INTERVAL)
+    finally:
+        await conn.close()
+
+
+async def run_load(url: str, users: int = 16, duration: float = 30, polls: int = 3, ranks: int = 2,
+                   distinct_resumes: int = 8, seed: int = 0) -> dict:
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+
+    # Distinct resumes exercise the parse path; repeats hit the resume cache
+    resumes = [make_pdf([p.split("\n") for p in make_resume_pages(seed=seed + i)]) for i in range(distinct_resumes)]
+    posts = make_posts(500, seed=seed)
+
+    recorder = Recorder()
+    flows_done = [0]
+    start = time.perf_counter()
+    stop_at = start + duration
+
+    tasks = [canary(recorder, host, port, stop_at)]
+    tasks += [
+        user_flow(recorder, host, port, resumes, posts, stop_at, polls, ranks, flows_done, random.Random(seed + i))
+        for i in range(users)
+    ]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    endpoints = recorder.summary(elapsed)
+    return {
+        "url": url,
+        "users": users,
+        "duration": round(elapsed, 2),
+        "flows": flows_done[0],
+        "flows_per_min": round(flows_done[0] / elapsed * 60, 1),
+        "requests": sum(e["requests"] for e in endpoints.values()),
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: dict):
+    print(f"\n📊 Load test: {report['users']} users for {report['duration']}s against {report['url']}")
+    print("=" * 92)
+    print(f"  Completed flows: {report['flows']} ({report['flows_per_min']}/min)  |  "
+          f"requests: {report['requests']}  |  errors: {report['errors']}")
+    print(f"\n  {'endpoint':36} {'reqs':>6} {'err':>5} {'rps':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, e in report["endpoints"].items():
+        print(f"  {name:36} {e['requests']:6} {e['errors']:5} {e['rps']:7} "
+              f"{e['p50_ms']:8} {e['p90_ms']:8} {e['p99_ms']:8} {e['max_ms']:8}")
+
+    canary_stats = report["endpoints"].get("canary GET /health")
+    if canary_stats and canary_stats["p99_ms"] > 250:
+        print(f"\n  ⚠️ /health p99 is {canary_stats['p99_ms']} ms under load: "
+              f"something is blocking the event loop")
+    print("=" * 92 + "\n")
+
+
+def spawn_server(port: int, workers: int, ollama_url: str):
+    """
+    Starts `uvicorn main:app` from backend/ with OLLAMA_URL pointing at
+    the stand-in server. Returns the process once /health answers.
+    """
+    import requests
+
+    env = dict(os.environ, OLLAMA_URL=ollama_url)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--polls", type=int, default=3, help="/results polls per flow")
+    parser.add_argument("--ranks", type=int, default=2, help="/rank calls per flow")
+    parser.add_argument("--distinct-resumes", type=int, default=8)
+    parser.add_argument("--spawn", action="store_true", help="start fake Ollama + uvicorn locally")
+    parser.add_argument("--port", type=int, default=8765, help="port for --spawn")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --spawn")
+    parser.add_argument("--ollama-latency", type=float, default=1.0, help="stand-in generation time for --spawn")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    server = process = None
+    url = args.url
+    if args.spawn:
+        from fake_ollama import start_fake_ollama
+
+        server, ollama_url = start_fake_ollama(latency=args.ollama_latency)
+        process = spawn_server(args.port, args.workers, ollama_url)
+        url = f"http://127.0.0.1:{args.port}"
+        print(f"🚀 Spawned uvicorn ({args.workers} worker(s)) on {url}, stand-in Ollama at {ollama_url}")
+
+    try:
+        report = asyncio.run(run_load(url, args.users, args.duration, args.polls, args.ranks, args.distinct_resumes))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if server is not None:
+            server.shutdown()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
@@ -0,0 +1,70 @@
+"""
+Minimal PDF writer for synthetic resumes: one Helvetica text stream per
+page, no external dependencies, output readable by pdfplumber/pypdfium2.
+"""
+
+import os
+
+from corpus import make_resume_pages
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages_lines) -> bytes:
+    """
+    Builds a PDF from a list of pages, each a list of text lines.
+    """
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    content_ids = []
+    for lines in pages_lines:
+        ops = ["BT /F1 10 Tf 12 TL 50 780 Td"]
+        ops.extend(f"({_escape(line)}) Tj T*" for line in lines)
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        content_ids.append(add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+
+    # Page objects reference the Pages node, which comes right after them
+    pages_id = len(objects) + len(content_ids) + 1
+    page_ids = [
+        add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font_id, content_id))
+        for content_id in content_ids
+    ]
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    add(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids)))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_offset)
+    return bytes(out)
+
+
+def write_resume_pdf(path: str, seed: int = 0, pages: int = 2, lines_per_page: int = 40) -> str:
+    """
+    Writes a synthetic resume PDF (see corpus.make_resume_pages) and
+    returns its path.
+    """
+    pages_lines = [page.split("\n") for page in make_resume_pages(seed, pages, lines_per_page)]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(make_pdf(pages_lines))
+    return path
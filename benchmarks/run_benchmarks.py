@@ -0,0 +1,328 @@
+"""
+Offline benchmark suite for the backend pipeline: PDF extraction, skill
+extraction, query generation (templates and the stand-in Ollama server),
+job-post filtering, ranking and the scraper against a saved HTML fixture.
+
+Every case records wall time (min/median over repeats), throughput and
+the Python heap peak (tracemalloc, from a separate run). Results go to a
+JSON file that a later run can be compared against.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 1000,10000,100000] [--only rank,filter]
+                                        [--output results.json] [--compare baseline.json]
+
+Sections: pdf, skills, queries, llm, filter, rank, scraper. Sections whose
+dependencies are missing (spaCy model, Playwright browser) are recorded as
+skipped rather than failing the run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from corpus import SKILLS, CITIES, make_posts, make_resume_text
+from pdf_fixtures import write_resume_pdf
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+SECTIONS = ["pdf", "skills", "queries", "llm", "filter", "rank", "scraper"]
+DEFAULT_SIZES = [1000, 10000, 100000]
+PDF_PAGE_COUNTS = [2, 10, 25]
+
+# Jobs x posts per job for the batch ranking case (one /rank/batch call
+# vs a loop of /rank calls)
+BATCH_RANK_JOBS = 50
+BATCH_RANK_POSTS = 500
+
+# Cases slower than the baseline by more than this are flagged by --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def measure(fn, items: int = 1, repeat: int = 3) -> dict:
+    """
+    Times `fn` over `repeat` runs, then runs it once more under
+    tracemalloc for the heap peak (kept separate so tracing overhead does
+    not skew the timings).
+    """
+    fn()  # warm-up: imports, lazy pools, caches
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "items": items,
+        "repeat": repeat,
+        "seconds_min": round(min(timings), 6),
+        "seconds_median": round(median, 6),
+        "items_per_sec": round(items / median, 1) if median else None,
+        "peak_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def _repeat_for(items: int) -> int:
+    return 1 if items >= 50000 else 3
+
+
+def bench_pdf(cases, sizes):
+    from resume_parser import extract_text_from_pdf
+
+    workdir = tempfile.mkdtemp(prefix="bench_pdf_")
+    for pages in PDF_PAGE_COUNTS:
+        path = write_resume_pdf(os.path.join(workdir, f"resume_{pages}p.pdf"), seed=pages, pages=pages)
+        cases[f"pdf_extract/{pages}p"] = measure(lambda: extract_text_from_pdf(path), items=pages, repeat=5)
+
+
+def bench_skills(cases, sizes):
+    from skill_extractor import extract_skills_and_topics
+
+    for pages in (1, 3):
+        text = make_resume_text(seed=pages, pages=pages).lower()
+        cases[f"extract_skills/{pages}p"] = measure(lambda: extract_skills_and_topics(text), repeat=5)
+
+
+def bench_queries(cases, sizes):
+    from query_builder_local_llm import build_fallback_queries
+
+    skills = SKILLS[:10]
+    locations = CITIES[:2]
+
+    def run():
+        for _ in range(100):
+            build_fallback_queries(skills, locations, "India", 12)
+
+    cases["fallback_queries/100"] = measure(run, items=100)
+
+
+def bench_llm(cases, sizes):
+    from fake_ollama import start_fake_ollama
+
+    server, url = start_fake_ollama(latency=0.0)
+    os.environ["OLLAMA_URL"] = url
+    import ollama_client
+    import query_builder_local_llm as qb
+    from disk_cache import DiskCache
+
+    # Every cache the cases create lives under one directory, removed afterwards
+    original_cache = qb.llm_cache
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_llm_") as cache_root:
+            client = ollama_client.get_client()
+            client.base_url = url
+            skills = SKILLS[:8]
+
+            def uncached():
+                qb.llm_cache = DiskCache(tempfile.mkdtemp(dir=cache_root), ttl=qb.LLM_CACHE_TTL)
+                qb.generate_queries_with_ollama(skills, CITIES[:1], "India", 12)
+
+            def cached():
+                qb.generate_queries_with_ollama(skills, CITIES[:1], "India", 12)
+
+            cases["llm_queries/uncached"] = measure(uncached, repeat=5)
+            cached()
+            cases["llm_queries/cached"] = measure(cached, repeat=5)
+    finally:
+        qb.llm_cache = original_cache
+        server.shutdown()
+
+
+def bench_filter(cases, sizes):
+    from linkedin_scraper import is_job_related_post
+
+    for size in sizes:
+        posts = make_posts(size, seed=size)
+
+        def run():
+            return sum(1 for p in posts if is_job_related_post(p["content"], p["author"]))
+
+        cases[f"job_filter/{size}"] = measure(run, items=size, repeat=_repeat_for(size))
+
+
+def bench_rank(cases, sizes):
+    from ranker import rank_many, rank_posts
+
+    resume_text = make_resume_text(seed=7).lower()
+    for size in sizes:
+        posts = make_posts(size, seed=size)
+        cases[f"rank_posts/{size}"] = measure(lambda: rank_posts(resume_text, posts, top_k=20),
+                                              items=size, repeat=_repeat_for(size))
+        cases[f"rank_posts_signals/{size}"] = measure(
+            lambda: rank_posts(resume_text, posts, top_k=20, skills=SKILLS, locations=CITIES[:3], country="India"),
+            items=size, repeat=_repeat_for(size))
+
+    jobs = [(make_resume_text(seed=i).lower(), make_posts(BATCH_RANK_POSTS, seed=1000 + i))
+            for i in range(BATCH_RANK_JOBS)]
+    items = BATCH_RANK_JOBS * BATCH_RANK_POSTS
+    label = f"{BATCH_RANK_JOBS}x{BATCH_RANK_POSTS}"
+    cases[f"rank_posts_loop/{label}"] = measure(lambda: [rank_posts(r, p, top_k=20) for r, p in jobs], items=items)
+    cases[f"rank_many/{label}"] = measure(lambda: rank_many(jobs, top_k=20), items=items)
+
+
+def bench_scraper(cases, sizes):
+    from playwright.sync_api import sync_playwright
+
+    import linkedin_scraper
+    from bench_scraper_replay import seed_recordings
+
+    query = "python developer hiring"
+    recordings = seed_recordings([query])
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        # Navigations are answered with the saved search page, nothing hits the network
+        linkedin_scraper.enable_replay(page, recordings)
+
+        stats = {}
+        start = time.perf_counter()
+        posts = linkedin_scraper._scrape_query(page, query, limit=10, stats=stats)
+        seconds = time.perf_counter() - start
+        browser.close()
+
+    timings = stats.get("timings", {})
+    waits = sum(v for k, v in timings.items() if k.endswith("_wait"))
+    cases["scrape_query/fixture"] = {
+        "items": stats.get("checked", 0),
+        "repeat": 1,
+        "seconds_min": round(seconds, 6),
+        "seconds_median": round(seconds, 6),
+        "items_per_sec": round(stats.get("checked", 0) / seconds, 1) if seconds else None,
+        "kept": len(posts),
+        "fixed_sleep_seconds": round(waits, 3),
+        "work_seconds": round(seconds - waits, 6),
+        "timings": timings,
+    }
+
+
+BENCHES = {
+    "pdf": bench_pdf,
+    "skills": bench_skills,
+    "queries": bench_queries,
+    "llm": bench_llm,
+    "filter": bench_filter,
+    "rank": bench_rank,
+    "scraper": bench_scraper,
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sections, sizes):
+    cases = {}
+    skipped = {}
+
+    for name in sections:
+        print(f"⏱️  {name} ...")
+        try:
+            BENCHES[name](cases, sizes)
+        except Exception as e:
+            # Missing model/browser and the like: record it and keep going
+            first_line = (str(e).strip().splitlines() or [""])[0]
+            skipped[name] = f"{type(e).__name__}: {first_line[:200]}"
+            print(f"  ⚠️ Skipped {name}: {skipped[name]}")
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "sizes": sizes,
+        },
+        "cases": cases,
+        "skipped": skipped,
+    }
+
+
+def print_results(results: dict):
+    print("\n📊 Benchmark results")
+    print("=" * 78)
+    print(f"  {'case':28} {'median s':>10} {'items/s':>12} {'peak MB':>9}")
+    for name, case in results["cases"].items():
+        rate = case.get("items_per_sec")
+        peak = case.get("peak_mb")
+        print(f"  {name:28} {case['seconds_median']:10.4f} "
+              f"{rate if rate is not None else '-':>12} {peak if peak is not None else '-':>9}")
+    for name, reason in results["skipped"].items():
+        print(f"  {name:28} skipped ({reason[:40]})")
+    print("=" * 78 + "\n")
+
+
+def compare(results: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD):
+    """
+    Prints the median time change per case against a baseline run and
+    returns the names of cases that got slower by more than `threshold`.
+    """
+    regressions = []
+    print(f"\n🔁 Compared with {baseline['meta'].get('git_revision')} ({baseline['meta'].get('timestamp')})")
+    print("=" * 78)
+    for name, case in results["cases"].items():
+        old = baseline.get("cases", {}).get(name)
+        if not old or not old.get("seconds_median"):
+            print(f"  {name:28} (new)")
+            continue
+        change = case["seconds_median"] / old["seconds_median"] - 1
+        flag = "⚠️" if change > threshold else "  "
+        if change > threshold:
+            regressions.append(name)
+        print(f"{flag} {name:28} {old['seconds_median']:10.4f} → {case['seconds_median']:10.4f}  {change * 100:+6.1f}%")
+    print("=" * 78 + "\n")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="post corpus sizes for filter/rank")
+    parser.add_argument("--only", help=f"comma-separated sections ({','.join(SECTIONS)})")
+    parser.add_argument("--skip", help="comma-separated sections to leave out")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/bench-<time>.json)")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    args = parser.parse_args()
+
+    sections = args.only.split(",") if args.only else list(SECTIONS)
+    if args.skip:
+        sections = [s for s in sections if s not in args.skip.split(",")]
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    results = run(sections, sizes)
+    print_results(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f))
+        if regressions:
+            raise SystemExit(f"❌ {len(regressions)} case(s) regressed: {', '.join(regressions)}")
@@ -0,0 +1,139 @@
+"""
+Bulk export of all jobs' posts in a columnar format, and offline
+reading of the archives (summary, re-ranking the full history,
+conversion).
+
+Usage:
+    python export_results.py export [-o results.arrow] [--format arrow|parquet] [--since-version N]
+    python export_results.py inspect results.arrow
+    python export_results.py rank results.arrow --resume resume.pdf [--top-k 20] [--skills python,sql] [--weights freshness:0]
+    python export_results.py convert results.arrow results.parquet
+
+`export` streams /export/results from the running backend to a file.
+Archives are memory-mapped when read. Requires pyarrow.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+# Backend modules import each other by bare name (they run from backend/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import results_archive
+
+BACKEND_URL = "http://127.0.0.1:8000"
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def export(output: str, fmt: str = "arrow", since_version: int = None):
+    params = {"format": fmt}
+    if since_version is not None:
+        params["since_version"] = since_version
+
+    print(f"\n📦 Exporting results from {BACKEND_URL} as {fmt}...")
+    start = time.perf_counter()
+    with requests.get(f"{BACKEND_URL}/export/results", params=params, stream=True) as resp:
+        if resp.status_code != 200:
+            print(f"❌ Export failed (Status: {resp.status_code}): {resp.text[:200]}")
+            return
+        size = 0
+        with open(output, "wb") as f:
+            for chunk in resp.iter_content(DOWNLOAD_CHUNK_BYTES):
+                f.write(chunk)
+                size += len(chunk)
+        version = resp.headers.get("X-Data-Version")
+
+    print(f"✅ Wrote {size / 1024:.1f} KB to {output} in {time.perf_counter() - start:.2f}s")
+    if version:
+        print(f"💡 Next incremental export: --since-version {version}")
+
+
+def inspect(path: str):
+    start = time.perf_counter()
+    table = results_archive.read_table(path)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📊 {path}: {table.num_rows} posts, {os.path.getsize(path) / 1024:.1f} KB "
+          f"(mapped in {elapsed * 1000:.1f} ms)")
+    print("=" * 60)
+    for column, title in (("job_id", "Posts per job"), ("query", "Top queries"), ("author", "Top authors")):
+        counts = table.column(column).value_counts().to_pylist()
+        counts.sort(key=lambda c: -c["counts"])
+        print(f"\n{title} ({len(counts)} distinct):")
+        for entry in counts[:10]:
+            print(f"  {entry['counts']:6}  {entry['values']}")
+    print("=" * 60 + "\n")
+
+
+def rank(path: str, resume: str, top_k: int = 20, skills=None, weights: str = None):
+    from ranker import rank_posts
+    from resume_parser import extract_text_from_pdf
+
+    posts = results_archive.load_posts(path)
+    resume_text = extract_text_from_pdf(resume)
+
+    start = time.perf_counter()
+    ranked = rank_posts(resume_text, posts, top_k=top_k, skills=skills, weights=weights)
+    print(f"\n🏆 Top {len(ranked)} of {len(posts)} posts ({time.perf_counter() - start:.2f}s)")
+    print("=" * 60)
+    for idx, post in enumerate(ranked, 1):
+        print(f"{idx:3}. [{post['score']}] {post['author'][:40]}")
+        print(f"     {post['content'][:120]}...")
+        if post["links"]:
+            print(f"     🔗 {post['links'][0]}")
+    print("=" * 60 + "\n")
+
+
+def convert(source: str, target: str):
+    table = results_archive.read_table(source)
+    if target.endswith(".parquet"):
+        results_archive.pq.write_table(table, target, compression=results_archive.COMPRESSION)
+    else:
+        options = results_archive.pa.ipc.IpcWriteOptions(compression=results_archive.COMPRESSION)
+        with results_archive.pa.ipc.new_file(target, table.schema, options=options) as writer:
+            writer.write_table(table)
+    print(f"✅ Converted {table.num_rows} posts: {source} → {target}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p_export = commands.add_parser("export", help="download all jobs' posts from the backend")
+    p_export.add_argument("-o", "--output")
+    p_export.add_argument("--format", choices=results_archive.FORMATS, default="arrow")
+    p_export.add_argument("--since-version", type=int)
+
+    p_inspect = commands.add_parser("inspect", help="summarize an archive")
+    p_inspect.add_argument("path")
+
+    p_rank = commands.add_parser("rank", help="rank every archived post against a resume")
+    p_rank.add_argument("path")
+    p_rank.add_argument("--resume", required=True)
+    p_rank.add_argument("--top-k", type=int, default=20)
+    p_rank.add_argument("--skills", help="comma-separated resume skills to boost")
+    p_rank.add_argument("--weights", help="signal weights, e.g. skills:0.2,freshness:0")
+
+    p_convert = commands.add_parser("convert", help="convert between .arrow and .parquet")
+    p_convert.add_argument("source")
+    p_convert.add_argument("target")
+
+    args = parser.parse_args()
+
+    if results_archive.pa is None:
+        print("❌ pyarrow is not installed: pip install pyarrow")
+        sys.exit(1)
+
+    if args.command == "export":
+        export(args.output or f"results.{args.format}", args.format, args.since_version)
+    elif args.command == "inspect":
+        inspect(args.path)
+    elif args.command == "rank":
+        skills = [s.strip() for s in args.skills.split(",")] if args.skills else None
+        rank(args.path, args.resume, args.top_k, skills, args.weights)
+    elif args.command == "convert":
+        convert(args.source, args.target)
@@ -213,7 +213,8 @@ function startPolling() {
 
 async function checkResults() {
     try {
-        const response = await fetch(`${API_BASE}/results/${currentJobId}`);
+        // Poll only the status; unchanged responses come back as 304s
+        const response = await fetch(`${API_BASE}/results/${currentJobId}?fields=status,result_count`);
         const data = await response.json();
         
         if (!response.ok) {
@@ -229,13 +230,22 @@ async function checkResults() {
                 pollingInterval = null;
             }
             
+            // Fetch the full results once
+            const fullResponse = await fetch(`${API_BASE}/results/${currentJobId}`);
+            const fullData = await fullResponse.json();
+            if (!fullResponse.ok) {
+                throw new Error(fullData.detail || fullData.error || 'Failed to fetch results');
+            }
+            
             // Display results
-            displayResults(data);
+            displayResults(fullData);
             showSection(resultsSection);
             showNotification(`Found ${resultCount} job posts!`, 'success');
             
         } else if (data.status === 'waiting_for_linkedin') {
             waitingStatus.textContent = `Waiting for scraper... (${resultCount} posts so far)`;
+        } else if (data.status === 'scraping') {
+            waitingStatus.textContent = `Scraping LinkedIn... (${resultCount} posts so far)`;
         } else {
             waitingStatus.textContent = `Polling... (${resultCount} posts collected)`;
         }
@@ -87,6 +87,9 @@ def main():
         'uvicorn[standard]',
         'python-multipart',
         'pdfplumber',
+        'pypdfium2',
+        'orjson',
+        'pyarrow',
         'spacy',
         'scikit-learn',
         'playwright',
@@ -0,0 +1,53 @@
+"""
+Aggregates scraper trace records (JSON lines) into a report of where
+scraping time goes: navigation, waits, scrolling, per-post extraction,
+selector fallbacks and post rejections.
+
+Usage:
+    python trace_report.py [scrape_traces.jsonl ...] [--json]
+
+Defaults to the agent's local trace file and the backend's uploaded
+traces (backend/cache/scrape_traces.jsonl), plus their rotated backups
+(.1, .2, ...), whichever exist.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Backend modules import each other by bare name (they run from backend/)
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from scrape_trace import TRACE_FILE, read_traces, rotated_paths, summarize, print_report
+
+DEFAULT_PATHS = [
+    rotated
+    for path in (TRACE_FILE, os.path.join(BACKEND_DIR, TRACE_FILE), os.path.join(BACKEND_DIR, "cache", TRACE_FILE))
+    for rotated in rotated_paths(path)
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="trace files (JSON lines)")
+    parser.add_argument("--job", help="only traces uploaded for this job_id")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    paths = args.paths or [p for p in DEFAULT_PATHS if os.path.exists(p)]
+    if not paths:
+        print("❌ No trace files found. Run the local agent first or pass a path.")
+        sys.exit(1)
+
+    traces = read_traces(paths)
+    if args.job:
+        traces = (t for t in traces if t.get("job_id") == args.job)
+
+    summary = summarize(traces)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"🧾 Reading {', '.join(paths)}")
+        print_report(summary)
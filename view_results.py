@@ -1,7 +1,13 @@
 import requests
 import json
-from backend.ranker import rank_posts
-from backend.resume_parser import extract_text_from_pdf
+import os
+import sys
+
+# Backend modules import each other by bare name (they run from backend/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from ranker import rank_posts
+from resume_parser import extract_text_from_pdf
 
 BACKEND_URL = "http://127.0.0.1:8000"
 
@@ -42,6 +48,10 @@ def view_results(job_id: str, rank_by_resume: bool = False):
             print("⏳ Waiting for LinkedIn scraping to complete...")
             print("   Run the local_agent.py to scrape LinkedIn posts")
             return
+
+        if status == "scraping":
+            print("⏳ The local agent is scraping LinkedIn...")
+            return
         
         if not results:
             print("❌ No results yet")